@@ -4,6 +4,7 @@ Interface Streamlit para otimização de rotas de veículos
 """
 
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 from modules.optimizer import VRPOptimizer
@@ -11,9 +12,6 @@ from modules.cost_calculator import CostCalculator
 from modules.data_handler import DataHandler
 from modules.visualizer import RouteVisualizer
 from modules.nearest_neighbor import NearestNeighborOptimizer
-import folium
-from streamlit_folium import folium_static
-import plotly.graph_objects as go
 
 # Configuração da página
 st.set_page_config(
@@ -48,6 +46,91 @@ if 'locations' not in st.session_state:
 if 'names' not in st.session_state:
     st.session_state.names = None
 
+@st.cache_data(show_spinner=False)
+def compute_distance_matrix(locations, method='haversine'):
+    """
+    Calcula a matriz de distâncias, memorizada pelo conteúdo das localizações.
+    
+    Ajustes de custos ou da frota não recalculam a matriz.
+    """
+    return DataHandler.create_distance_matrix(list(locations), method=method)
+
+@st.cache_data(show_spinner=False)
+def compute_route_costs(
+    route_distances_km,
+    fuel_price,
+    fuel_consumption,
+    driver_cost_per_hour,
+    include_tolls
+):
+    """Calcula os custos das rotas, memorizados pelos parâmetros de custo."""
+    calculator = CostCalculator(
+        fuel_price_per_liter=fuel_price,
+        fuel_consumption_km_per_liter=fuel_consumption,
+        driver_cost_per_hour=driver_cost_per_hour,
+        include_tolls=include_tolls
+    )
+    # O app só usa os totais: dispensar o detalhamento por rota
+    return calculator.calculate_route_costs(list(route_distances_km), breakdown=False)
+
+@st.cache_data(show_spinner=False)
+def render_route_map_html(locations, routes, names, route_distances):
+    """
+    Gera o HTML do mapa de rotas, memorizado pelas rotas e localizações.
+    
+    Mudanças em widgets que não afetam o mapa reaproveitam o HTML pronto em
+    vez de montar e serializar o mapa Folium de novo.
+    """
+    import folium
+    
+    route_map = RouteVisualizer.create_route_map(
+        locations=locations,
+        routes=routes,
+        names=names,
+        depot_index=0,
+        route_distances=route_distances
+    )
+    return folium.Figure().add_child(route_map).render()
+
+@st.cache_data(show_spinner=False)
+def build_routes_summary(routes, names, route_distances_km, route_loads=None):
+    """Monta a tabela-resumo das rotas (uma linha por veículo)."""
+    summary = {
+        'Veículo': [f"Veículo {vehicle_id + 1}" for vehicle_id in range(len(routes))],
+        'Rota': [" → ".join(map(names.__getitem__, route)) for route in routes],
+        'Distância (km)': np.round(route_distances_km, 2)
+    }
+    
+    if route_loads is not None:
+        summary['Carga'] = route_loads
+    
+    return pd.DataFrame(summary)
+
+@st.cache_data(show_spinner=False)
+def routes_to_csv(df_routes):
+    """Serializa a tabela de rotas em CSV (bytes), memorizado pelo conteúdo."""
+    return df_routes.to_csv(index=False).encode('utf-8-sig')
+
+@st.cache_data(show_spinner=False)
+def routes_to_excel(df_routes):
+    """Serializa a tabela de rotas em Excel (bytes), memorizado pelo conteúdo."""
+    from io import BytesIO
+    buffer = BytesIO()
+    # xlsxwriter em modo constant_memory grava linha a linha, sem
+    # montar a planilha inteira em memória como o openpyxl. Nesse modo
+    # as células precisam ser escritas em ordem de linha, por isso as
+    # linhas são gravadas diretamente em vez de usar df.to_excel
+    with pd.ExcelWriter(
+        buffer,
+        engine='xlsxwriter',
+        engine_kwargs={'options': {'constant_memory': True}}
+    ) as writer:
+        worksheet = writer.book.add_worksheet('Rotas')
+        worksheet.write_row(0, 0, df_routes.columns)
+        for row_idx, row in enumerate(df_routes.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_idx, 0, row)
+    return buffer.getvalue()
+
 # Função para carregar dados
 def load_data():
     """Carrega dados baseado no modo selecionado."""
@@ -249,10 +332,11 @@ if data is not None:
     
     # Mostrar dados carregados
     with st.expander("📍 Visualizar Localizações Carregadas", expanded=False):
+        locations_arr = np.asarray(locations, dtype=np.float64)
         df_locations = pd.DataFrame({
             'Nome': names,
-            'Latitude': [loc[0] for loc in locations],
-            'Longitude': [loc[1] for loc in locations]
+            'Latitude': locations_arr[:, 0],
+            'Longitude': locations_arr[:, 1]
         })
         
         if demands:
@@ -308,6 +392,7 @@ if data is not None:
             strategy = st.selectbox(
                 "Estratégia de Primeira Solução:",
                 [
+                    'AUTOMATIC',
                     'PATH_CHEAPEST_ARC',
                     'SAVINGS',
                     'SWEEP',
@@ -331,10 +416,12 @@ if data is not None:
             
             time_limit = st.slider(
                 "Tempo Limite (segundos):",
-                min_value=10,
+                min_value=1,
                 max_value=300,
-                value=30,
-                help="Tempo máximo para buscar soluções"
+                value=VRPOptimizer.suggest_time_limit(len(locations)),
+                help="Tempo máximo para buscar soluções. O padrão cresce com o "
+                     "número de localizações: a GLS converge em poucos segundos "
+                     "em instâncias pequenas e precisa de mais tempo nas grandes."
             )
     else:
         strategy = 'PATH_CHEAPEST_ARC'
@@ -377,8 +464,8 @@ if data is not None:
         with st.spinner(f"Otimizando rotas com {algorithm}... Por favor, aguarde."):
             try:
                 # Criar matriz de distâncias
-                distance_matrix = DataHandler.create_distance_matrix(
-                    locations,
+                distance_matrix = compute_distance_matrix(
+                    tuple(map(tuple, locations)),
                     method='haversine'
                 )
                 
@@ -393,12 +480,27 @@ if data is not None:
                         max_distance_per_vehicle=int(max_distance_km * 1000)
                     )
                     
+                    # Instâncias pequenas: tentar provar a solução ótima com o
+                    # CP-SAT por pouco tempo; sem prova, usar os parâmetros escolhidos
+                    success = False
+                    if local_search != 'Nenhuma' and len(locations) <= VRPOptimizer.exact_max_locations(num_vehicles):
+                        success = optimizer.solve_exact(
+                            time_limit_seconds=min(time_limit, VRPOptimizer.EXACT_TIME_LIMIT_SECONDS),
+                            require_optimal=True
+                        )
+                        if success:
+                            st.sidebar.info(
+                                "ℹ️ Solução ótima provada pelo solver exato (CP-SAT); "
+                                "a estratégia e a metaheurística escolhidas não foram necessárias."
+                            )
+                    
                     # Resolver com parâmetros configurados
-                    success = optimizer.solve(
-                        time_limit_seconds=time_limit,
-                        strategy=strategy,
-                        local_search=None if local_search == 'Nenhuma' else local_search
-                    )
+                    if not success:
+                        success = optimizer.solve(
+                            time_limit_seconds=time_limit,
+                            strategy=strategy,
+                            local_search=None if local_search == 'Nenhuma' else local_search
+                        )
                     
                 else:  # Nearest Neighbor
                     optimizer = NearestNeighborOptimizer(
@@ -433,35 +535,30 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
     routes = metrics['routes']
     route_distances = metrics['route_distances']
     
+    # Distâncias em km calculadas uma única vez para todas as abas
+    route_distances_km = np.asarray(route_distances, dtype=np.float64) / 1000
+    total_distance_km = metrics['total_distance'] / 1000
+    
     # Tabs para organizar informações
     tab1, tab2, tab3, tab4 = st.tabs(["📍 Mapa", "📊 Métricas", "💰 Custos", "📥 Exportar"])
     
     with tab1:
         st.subheader("Mapa de Rotas Otimizadas")
         
-        # Criar mapa
-        route_map = RouteVisualizer.create_route_map(
-            locations=locations,
-            routes=routes,
-            names=names,
-            depot_index=0,
-            route_distances=route_distances
-        )
-        
-        # Exibir mapa
-        folium_static(route_map, width=1200, height=600)
+        # Exibir mapa (HTML memorizado: só é gerado de novo quando as rotas mudam)
+        map_html = render_route_map_html(locations, routes, names, route_distances)
+        components.html(map_html, width=1200, height=610)
         
         # Informações das rotas
         st.markdown("### 🚛 Detalhes das Rotas")
         
-        for vehicle_id, route in enumerate(routes):
-            with st.expander(f"Veículo {vehicle_id + 1} - {route_distances[vehicle_id]/1000:.2f} km"):
-                route_info = " → ".join([names[idx] for idx in route])
-                st.write(f"**Rota:** {route_info}")
-                st.write(f"**Distância:** {route_distances[vehicle_id]/1000:.2f} km")
-                
-                if 'route_loads' in metrics:
-                    st.write(f"**Carga:** {metrics['route_loads'][vehicle_id]}")
+        df_routes_summary = build_routes_summary(
+            routes,
+            names,
+            route_distances_km,
+            metrics.get('route_loads')
+        )
+        st.dataframe(df_routes_summary, use_container_width=True, hide_index=True)
     
     with tab2:
         st.subheader("Métricas da Solução")
@@ -472,7 +569,7 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
         with col1:
             st.metric(
                 "Distância Total",
-                f"{metrics['total_distance']/1000:.2f} km"
+                f"{total_distance_km:.2f} km"
             )
         
         with col2:
@@ -522,16 +619,14 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
         st.subheader("Análise de Custos")
         
         # Calcular custos
-        calculator = CostCalculator(
-            fuel_price_per_liter=fuel_price,
-            fuel_consumption_km_per_liter=fuel_consumption,
-            driver_cost_per_hour=driver_cost_per_hour,
-            include_tolls=include_tolls
+        costs = compute_route_costs(
+            tuple(route_distances_km),
+            fuel_price,
+            fuel_consumption,
+            driver_cost_per_hour,
+            include_tolls
         )
         
-        route_distances_km = [d / 1000 for d in route_distances]
-        costs = calculator.calculate_route_costs(route_distances_km)
-        
         # Métricas de custo
         col1, col2, col3, col4 = st.columns(4)
         
@@ -572,16 +667,17 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
         with col2:
             # Tabela de custos
             st.markdown("#### Resumo")
+            cost_values = pd.Series([
+                costs['total_fuel_cost'],
+                costs['total_driver_cost'],
+                costs['total_depreciation_cost'],
+                costs['total_toll_cost'],
+                costs['total_operational_cost'],
+                costs['total_cost']
+            ])
             cost_data = {
                 'Item': ['Combustível', 'Motorista', 'Depreciação', 'Pedágios', 'Operacional', 'TOTAL'],
-                'Valor (R$)': [
-                    f"{costs['total_fuel_cost']:.2f}",
-                    f"{costs['total_driver_cost']:.2f}",
-                    f"{costs['total_depreciation_cost']:.2f}",
-                    f"{costs['total_toll_cost']:.2f}",
-                    f"{costs['total_operational_cost']:.2f}",
-                    f"{costs['total_cost']:.2f}"
-                ]
+                'Valor (R$)': cost_values.map('{:.2f}'.format)
             }
             st.dataframe(pd.DataFrame(cost_data), use_container_width=True, hide_index=True)
         
@@ -609,10 +705,9 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
         
         with col1:
             # Download CSV
-            csv = df_routes.to_csv(index=False, encoding='utf-8-sig')
             st.download_button(
                 label="📥 Download CSV",
-                data=csv,
+                data=routes_to_csv(df_routes),
                 file_name="rotas_otimizadas.csv",
                 mime="text/csv",
                 use_container_width=True
@@ -620,14 +715,9 @@ if st.session_state.solution_calculated and st.session_state.optimizer is not No
         
         with col2:
             # Download Excel
-            from io import BytesIO
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df_routes.to_excel(writer, sheet_name='Rotas', index=False)
-            
             st.download_button(
                 label="📥 Download Excel",
-                data=buffer.getvalue(),
+                data=routes_to_excel(df_routes),
                 file_name="rotas_otimizadas.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 use_container_width=True
@@ -9,6 +9,47 @@ from modules.optimizer import VRPOptimizer
 from modules.nearest_neighbor import NearestNeighborOptimizer
 from modules.data_handler import DataHandler
 
+# Algoritmos comparados: (nome, estratégia do OR-Tools ou None para Nearest Neighbor)
+ALGORITHMS = [
+    ('Nearest Neighbor', None),
+    ('OR-Tools (PATH_CHEAPEST_ARC)', 'PATH_CHEAPEST_ARC'),
+    ('OR-Tools (SAVINGS)', 'SAVINGS'),
+]
+
+def _run_algorithm(config, distance_matrix, num_vehicles):
+    """
+    Executa um algoritmo da comparação.
+    
+    Returns:
+        Tupla (nome, métricas ou None se falhou, tempo em segundos)
+    """
+    algo_name, strategy = config
+    
+    if strategy is None:
+        optimizer = NearestNeighborOptimizer(
+            distance_matrix=distance_matrix,
+            num_vehicles=num_vehicles,
+            depot_index=0
+        )
+        start = time.time()
+        success = optimizer.solve()
+    else:
+        optimizer = VRPOptimizer(
+            distance_matrix=distance_matrix,
+            num_vehicles=num_vehicles,
+            depot_index=0,
+            max_distance_per_vehicle=100000
+        )
+        start = time.time()
+        success = optimizer.solve(
+            time_limit_seconds=30,
+            strategy=strategy,
+            local_search=None
+        )
+    elapsed = time.time() - start
+    
+    return algo_name, optimizer.get_metrics() if success else None, elapsed
+
 def compare_algorithms():
     """Compara diferentes algoritmos de otimização."""
     
@@ -39,102 +80,25 @@ def compare_algorithms():
     # Resultados
     results = {}
     
-    # ========================================
-    # TESTE 1: Nearest Neighbor
-    # ========================================
-    print("\n" + "-"*70)
-    print("🔍 Testando: Nearest Neighbor")
-    print("-"*70)
-    
-    optimizer_nn = NearestNeighborOptimizer(
-        distance_matrix=distance_matrix,
-        num_vehicles=num_vehicles,
-        depot_index=0
-    )
-    
-    start = time.time()
-    success_nn = optimizer_nn.solve()
-    time_nn = time.time() - start
-    
-    if success_nn:
-        metrics_nn = optimizer_nn.get_metrics()
-        results['Nearest Neighbor'] = metrics_nn
-        
-        print(f"✅ Solução encontrada!")
-        print(f"   Distância Total: {metrics_nn['total_distance']/1000:.2f} km")
-        print(f"   Maior Rota: {metrics_nn['max_route_distance']/1000:.2f} km")
-        print(f"   Veículos Usados: {metrics_nn['num_vehicles_used']}")
-        print(f"   Tempo: {time_nn:.3f}s")
-    else:
-        print("❌ Falhou")
-    
-    # ========================================
-    # TESTE 2: OR-Tools (PATH_CHEAPEST_ARC)
-    # ========================================
-    print("\n" + "-"*70)
-    print("🔍 Testando: OR-Tools (PATH_CHEAPEST_ARC)")
-    print("-"*70)
-    
-    optimizer_or1 = VRPOptimizer(
-        distance_matrix=distance_matrix,
-        num_vehicles=num_vehicles,
-        depot_index=0,
-        max_distance_per_vehicle=100000
-    )
-    
-    start = time.time()
-    success_or1 = optimizer_or1.solve(
-        time_limit_seconds=30,
-        strategy='PATH_CHEAPEST_ARC',
-        local_search=None
-    )
-    time_or1 = time.time() - start
-    
-    if success_or1:
-        metrics_or1 = optimizer_or1.get_metrics()
-        results['OR-Tools (PATH_CHEAPEST_ARC)'] = metrics_or1
+    # Executar um algoritmo por vez: rodando juntos, eles disputariam a CPU
+    # e os tempos medidos deixariam de ser comparáveis
+    for config in ALGORITHMS:
+        print("\n" + "-"*70)
+        print(f"🔍 Testando: {config[0]}")
+        print("-"*70)
         
-        print(f"✅ Solução encontrada!")
-        print(f"   Distância Total: {metrics_or1['total_distance']/1000:.2f} km")
-        print(f"   Maior Rota: {metrics_or1['max_route_distance']/1000:.2f} km")
-        print(f"   Veículos Usados: {metrics_or1['num_vehicles_used']}")
-        print(f"   Tempo: {time_or1:.3f}s")
-    else:
-        print("❌ Falhou")
-    
-    # ========================================
-    # TESTE 3: OR-Tools (SAVINGS)
-    # ========================================
-    print("\n" + "-"*70)
-    print("🔍 Testando: OR-Tools (SAVINGS)")
-    print("-"*70)
-    
-    optimizer_or2 = VRPOptimizer(
-        distance_matrix=distance_matrix,
-        num_vehicles=num_vehicles,
-        depot_index=0,
-        max_distance_per_vehicle=100000
-    )
-    
-    start = time.time()
-    success_or2 = optimizer_or2.solve(
-        time_limit_seconds=30,
-        strategy='SAVINGS',
-        local_search=None
-    )
-    time_or2 = time.time() - start
-    
-    if success_or2:
-        metrics_or2 = optimizer_or2.get_metrics()
-        results['OR-Tools (SAVINGS)'] = metrics_or2
+        algo_name, metrics, elapsed = _run_algorithm(config, distance_matrix, num_vehicles)
         
-        print(f"✅ Solução encontrada!")
-        print(f"   Distância Total: {metrics_or2['total_distance']/1000:.2f} km")
-        print(f"   Maior Rota: {metrics_or2['max_route_distance']/1000:.2f} km")
-        print(f"   Veículos Usados: {metrics_or2['num_vehicles_used']}")
-        print(f"   Tempo: {time_or2:.3f}s")
-    else:
-        print("❌ Falhou")
+        if metrics:
+            results[algo_name] = metrics
+            
+            print(f"✅ Solução encontrada!")
+            print(f"   Distância Total: {metrics['total_distance']/1000:.2f} km")
+            print(f"   Maior Rota: {metrics['max_route_distance']/1000:.2f} km")
+            print(f"   Veículos Usados: {metrics['num_vehicles_used']}")
+            print(f"   Tempo: {elapsed:.3f}s")
+        else:
+            print("❌ Falhou")
     
     # ========================================
     # COMPARAÇÃO FINAL
@@ -144,8 +108,12 @@ def compare_algorithms():
     print("="*70)
     
     if results:
-        # Criar tabela comparativa
+        # Criar tabela comparativa e, na mesma passada, encontrar o melhor,
+        # o mais rápido e o pior resultado
         comparison_data = []
+        best_algo = fastest_algo = None
+        best_distance = fastest_time = float('inf')
+        worst_distance = float('-inf')
         
         for algo_name, metrics in results.items():
             comparison_data.append({
@@ -155,26 +123,26 @@ def compare_algorithms():
                 'Veículos Usados': metrics['num_vehicles_used'],
                 'Tempo (s)': f"{metrics['execution_time']:.3f}"
             })
+            
+            distance = metrics['total_distance']
+            if distance < best_distance:
+                best_algo, best_distance = algo_name, distance
+            if metrics['execution_time'] < fastest_time:
+                fastest_algo, fastest_time = algo_name, metrics['execution_time']
+            worst_distance = max(worst_distance, distance)
         
         df = pd.DataFrame(comparison_data)
         print("\n" + df.to_string(index=False))
         
-        # Encontrar melhor solução
-        best_algo = min(results.items(), key=lambda x: x[1]['total_distance'])
-        fastest_algo = min(results.items(), key=lambda x: x[1]['execution_time'])
-        
         print("\n" + "-"*70)
-        print(f"🏆 Melhor Distância: {best_algo[0]}")
-        print(f"   {best_algo[1]['total_distance']/1000:.2f} km")
+        print(f"🏆 Melhor Distância: {best_algo}")
+        print(f"   {best_distance/1000:.2f} km")
         
-        print(f"\n⚡ Mais Rápido: {fastest_algo[0]}")
-        print(f"   {fastest_algo[1]['execution_time']:.3f}s")
+        print(f"\n⚡ Mais Rápido: {fastest_algo}")
+        print(f"   {fastest_time:.3f}s")
         
         # Calcular economia
         if len(results) > 1:
-            distances = [m['total_distance'] for m in results.values()]
-            worst_distance = max(distances)
-            best_distance = min(distances)
             savings_km = (worst_distance - best_distance) / 1000
             savings_percent = ((worst_distance - best_distance) / worst_distance) * 100
             
@@ -0,0 +1,96 @@
+"""
+Kernels Numba (opcionais)
+Versões compiladas das rotinas numéricas mais pesadas do sistema
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba é uma dependência opcional
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def haversine_matrix(lat, lon, radius, round_to_int, out):
+        """
+        Preenche `out` com as distâncias de Haversine entre todos os pares.
+
+        Os senos e cossenos são calculados uma vez por ponto; o laço
+        interno usa apenas multiplicações e somas. Como a distância é
+        simétrica, só o triângulo superior é calculado e espelhado.
+
+        Args:
+            lat: Latitudes em radianos
+            lon: Longitudes em radianos
+            radius: Raio da Terra (define a unidade do resultado)
+            round_to_int: Arredonda as distâncias (para `out` inteiro)
+            out: Matriz (N, N) pré-alocada que recebe as distâncias
+        """
+        n = lat.shape[0]
+        cos_lat = np.cos(lat)
+        sin_half_lat = np.sin(lat / 2)
+        cos_half_lat = np.cos(lat / 2)
+        sin_half_lon = np.sin(lon / 2)
+        cos_half_lon = np.cos(lon / 2)
+
+        for i in prange(n):
+            # A diagonal é zero por definição
+            out[i, i] = 0.0
+            for j in range(i + 1, n):
+                sin_dlat = sin_half_lat[j] * cos_half_lat[i] - cos_half_lat[j] * sin_half_lat[i]
+                sin_dlon = sin_half_lon[j] * cos_half_lon[i] - cos_half_lon[j] * sin_half_lon[i]
+                a = sin_dlat * sin_dlat + cos_lat[i] * cos_lat[j] * sin_dlon * sin_dlon
+                distance = 2 * radius * math.asin(math.sqrt(min(a, 1.0)))
+                if round_to_int:
+                    distance = math.floor(distance + 0.5)
+                out[i, j] = distance
+                out[j, i] = distance
+
+    @njit(cache=True)
+    def nearest_neighbor_routes(distance_matrix, depot, num_vehicles, max_customers_per_route, order, route_sizes):
+        """
+        Constrói as rotas do Nearest Neighbor.
+
+        Cada veículo parte do depósito e visita sempre o cliente não visitado
+        mais próximo, até atingir o limite de clientes por rota. Empates ficam
+        com o menor índice, como no np.argmin.
+
+        Args:
+            distance_matrix: Matriz (N, N) de distâncias
+            depot: Índice do depósito
+            num_vehicles: Número de veículos disponíveis
+            max_customers_per_route: Máximo de clientes por rota
+            order: Vetor (N - 1,) que recebe os clientes na ordem de visita
+            route_sizes: Vetor (num_vehicles,) que recebe o nº de clientes por rota
+
+        Returns:
+            Número de clientes visitados
+        """
+        n = distance_matrix.shape[0]
+        visited = np.zeros(n, dtype=np.bool_)
+        visited[depot] = True
+        count = 0
+
+        for vehicle in range(num_vehicles):
+            route_sizes[vehicle] = 0
+            current = depot
+            while count < n - 1 and route_sizes[vehicle] < max_customers_per_route:
+                best = -1
+                best_distance = 0.0
+                for j in range(n):
+                    if not visited[j] and (best < 0 or distance_matrix[current, j] < best_distance):
+                        best = j
+                        best_distance = distance_matrix[current, j]
+                visited[best] = True
+                order[count] = best
+                count += 1
+                route_sizes[vehicle] += 1
+                current = best
+
+        return count
@@ -3,6 +3,7 @@ Módulo de Cálculo de Custos Logísticos
 Adaptado para a realidade brasileira
 """
 
+import sys
 from typing import Dict, List
 import numpy as np
 
@@ -57,6 +58,39 @@ class CostCalculator:
         self.average_speed_kmh = average_speed_kmh
         self.include_tolls = include_tolls
     
+    # Todos os custos são lineares na distância: taxas por km derivadas dos
+    # atributos públicos a cada uso, para refletir alterações feitas depois
+    # da construção
+    @property
+    def _fuel_per_km(self) -> float:
+        return self.fuel_price_per_liter / self.fuel_consumption_km_per_liter
+    
+    @property
+    def _time_per_km(self) -> float:
+        return 1.0 / self.average_speed_kmh
+    
+    @property
+    def _driver_per_km(self) -> float:
+        return self.driver_cost_per_hour / self.average_speed_kmh
+    
+    @property
+    def _toll_per_km(self) -> float:
+        return self.toll_cost_per_100km / 100.0 if self.include_tolls else 0.0
+    
+    @property
+    def _total_per_km(self) -> float:
+        return (
+            self._fuel_per_km +
+            self._driver_per_km +
+            self.vehicle_depreciation_per_km +
+            self._toll_per_km +
+            self.cost_per_km
+        )
+    
+    @property
+    def _co2_per_km(self) -> float:
+        return self.CO2_EMISSION_PER_LITER / self.fuel_consumption_km_per_liter
+    
     def calculate_fuel_cost(self, distance_km: float) -> float:
         """
         Calcula o custo de combustível.
@@ -67,8 +101,7 @@ class CostCalculator:
         Returns:
             Custo de combustível em R$
         """
-        liters_consumed = distance_km / self.fuel_consumption_km_per_liter
-        return liters_consumed * self.fuel_price_per_liter
+        return distance_km * self._fuel_per_km
     
     def calculate_time_hours(self, distance_km: float) -> float:
         """
@@ -80,7 +113,7 @@ class CostCalculator:
         Returns:
             Tempo em horas
         """
-        return distance_km / self.average_speed_kmh
+        return distance_km * self._time_per_km
     
     def calculate_driver_cost(self, distance_km: float) -> float:
         """
@@ -92,8 +125,7 @@ class CostCalculator:
         Returns:
             Custo do motorista em R$
         """
-        time_hours = self.calculate_time_hours(distance_km)
-        return time_hours * self.driver_cost_per_hour
+        return distance_km * self._driver_per_km
     
     def calculate_depreciation_cost(self, distance_km: float) -> float:
         """
@@ -117,9 +149,7 @@ class CostCalculator:
         Returns:
             Custo de pedágios em R$
         """
-        if not self.include_tolls:
-            return 0.0
-        return (distance_km / 100.0) * self.toll_cost_per_100km
+        return distance_km * self._toll_per_km
     
     def calculate_operational_cost(self, distance_km: float) -> float:
         """
@@ -143,29 +173,15 @@ class CostCalculator:
         Returns:
             Dicionário com breakdown de custos
         """
-        fuel_cost = self.calculate_fuel_cost(distance_km)
-        driver_cost = self.calculate_driver_cost(distance_km)
-        depreciation_cost = self.calculate_depreciation_cost(distance_km)
-        toll_cost = self.calculate_toll_cost(distance_km)
-        operational_cost = self.calculate_operational_cost(distance_km)
-        
-        total_cost = (
-            fuel_cost + 
-            driver_cost + 
-            depreciation_cost + 
-            toll_cost + 
-            operational_cost
-        )
-        
         return {
             'distance_km': distance_km,
-            'fuel_cost': fuel_cost,
-            'driver_cost': driver_cost,
-            'depreciation_cost': depreciation_cost,
-            'toll_cost': toll_cost,
-            'operational_cost': operational_cost,
-            'total_cost': total_cost,
-            'time_hours': self.calculate_time_hours(distance_km)
+            'fuel_cost': distance_km * self._fuel_per_km,
+            'driver_cost': distance_km * self._driver_per_km,
+            'depreciation_cost': distance_km * self.vehicle_depreciation_per_km,
+            'toll_cost': distance_km * self._toll_per_km,
+            'operational_cost': distance_km * self.cost_per_km,
+            'total_cost': distance_km * self._total_per_km,
+            'time_hours': distance_km * self._time_per_km
         }
     
     def calculate_co2_emissions(self, distance_km: float) -> float:
@@ -178,47 +194,88 @@ class CostCalculator:
         Returns:
             Emissões de CO2 em kg
         """
-        liters_consumed = distance_km / self.fuel_consumption_km_per_liter
-        return liters_consumed * self.CO2_EMISSION_PER_LITER
+        return distance_km * self._co2_per_km
     
-    def calculate_route_costs(self, route_distances_km: List[float]) -> Dict:
+    def calculate_route_costs(
+        self,
+        route_distances_km: List[float],
+        breakdown: bool = True,
+        columnar: bool = False
+    ) -> Dict:
         """
         Calcula custos para múltiplas rotas.
         
+        Todos os componentes são lineares na distância, então são calculados
+        de uma vez sobre o array de distâncias com as taxas por km.
+        
         Args:
             route_distances_km: Lista de distâncias de rotas em km
+            breakdown: Se deve incluir o detalhamento por rota ('route_costs')
+            columnar: Detalhamento em colunas (um array por componente) em vez
+                da lista com um dicionário por rota
             
         Returns:
             Dicionário com custos agregados
         """
-        total_distance = sum(route_distances_km)
-        route_costs = [self.calculate_total_cost(dist) for dist in route_distances_km]
+        distances = np.asarray(route_distances_km, dtype=np.float64).reshape(-1)
+        num_routes = len(distances)
+        
+        fuel = distances * self._fuel_per_km
+        driver = distances * self._driver_per_km
+        depreciation = distances * self.vehicle_depreciation_per_km
+        toll = distances * self._toll_per_km
+        operational = distances * self.cost_per_km
+        total = distances * self._total_per_km
+        time_hours = distances * self._time_per_km
         
-        total_fuel_cost = sum(rc['fuel_cost'] for rc in route_costs)
-        total_driver_cost = sum(rc['driver_cost'] for rc in route_costs)
-        total_depreciation = sum(rc['depreciation_cost'] for rc in route_costs)
-        total_toll_cost = sum(rc['toll_cost'] for rc in route_costs)
-        total_operational = sum(rc['operational_cost'] for rc in route_costs)
-        total_cost = sum(rc['total_cost'] for rc in route_costs)
-        total_time = sum(rc['time_hours'] for rc in route_costs)
-        total_co2 = self.calculate_co2_emissions(total_distance)
+        total_distance = float(distances.sum())
+        total_cost = float(total.sum())
+        
+        route_costs = []
+        if breakdown:
+            columns = {
+                'distance_km': distances,
+                'fuel_cost': fuel,
+                'driver_cost': driver,
+                'depreciation_cost': depreciation,
+                'toll_cost': toll,
+                'operational_cost': operational,
+                'total_cost': total,
+                'time_hours': time_hours
+            }
+            route_costs = columns if columnar else self._columns_to_records(columns)
         
         return {
             'total_distance_km': total_distance,
-            'total_fuel_cost': total_fuel_cost,
-            'total_driver_cost': total_driver_cost,
-            'total_depreciation_cost': total_depreciation,
-            'total_toll_cost': total_toll_cost,
-            'total_operational_cost': total_operational,
+            'total_fuel_cost': float(fuel.sum()),
+            'total_driver_cost': float(driver.sum()),
+            'total_depreciation_cost': float(depreciation.sum()),
+            'total_toll_cost': float(toll.sum()),
+            'total_operational_cost': float(operational.sum()),
             'total_cost': total_cost,
-            'total_time_hours': total_time,
-            'total_co2_kg': total_co2,
-            'num_routes': len(route_distances_km),
+            'total_time_hours': float(time_hours.sum()),
+            'total_co2_kg': self.calculate_co2_emissions(total_distance),
+            'num_routes': num_routes,
             'route_costs': route_costs,
-            'average_cost_per_route': total_cost / len(route_distances_km) if route_distances_km else 0,
+            'average_cost_per_route': total_cost / num_routes if num_routes else 0,
             'cost_per_km': total_cost / total_distance if total_distance > 0 else 0
         }
     
+    @staticmethod
+    def _columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+        """
+        Converte o detalhamento em colunas em uma lista de dicionários por rota.
+        
+        Args:
+            columns: Dicionário com um array por componente de custo
+            
+        Returns:
+            Lista com um dicionário por rota (mesmas chaves de calculate_total_cost)
+        """
+        keys = list(columns)
+        values = [columns[key].tolist() for key in keys]
+        return [dict(zip(keys, route_values)) for route_values in zip(*values)]
+    
     def compare_scenarios(
         self, 
         scenario1_distances: List[float],
@@ -267,26 +324,31 @@ class CostCalculator:
         Args:
             costs: Dicionário de custos retornado por calculate_route_costs
         """
-        print(f"\n{'='*60}")
-        print(f"ANÁLISE DE CUSTOS LOGÍSTICOS")
-        print(f"{'='*60}")
-        print(f"Distância Total: {costs['total_distance_km']:.2f} km")
-        print(f"Tempo Total: {costs['total_time_hours']:.2f} horas")
-        print(f"Número de Rotas: {costs['num_routes']}")
-        print(f"\n{'CUSTOS DETALHADOS':^60}")
-        print(f"{'-'*60}")
-        print(f"Combustível:        R$ {costs['total_fuel_cost']:>10,.2f}")
-        print(f"Motorista:          R$ {costs['total_driver_cost']:>10,.2f}")
-        print(f"Depreciação:        R$ {costs['total_depreciation_cost']:>10,.2f}")
-        print(f"Pedágios:           R$ {costs['total_toll_cost']:>10,.2f}")
-        print(f"Operacional:        R$ {costs['total_operational_cost']:>10,.2f}")
-        print(f"{'-'*60}")
-        print(f"CUSTO TOTAL:        R$ {costs['total_cost']:>10,.2f}")
-        print(f"{'-'*60}")
-        print(f"Custo por km:       R$ {costs['cost_per_km']:>10,.2f}")
-        print(f"Custo por rota:     R$ {costs['average_cost_per_route']:>10,.2f}")
-        print(f"\n{'IMPACTO AMBIENTAL':^60}")
-        print(f"{'-'*60}")
-        print(f"Emissões CO2:       {costs['total_co2_kg']:>10,.2f} kg")
-        print(f"{'='*60}\n")
+        lines = [
+            f"\n{'='*60}",
+            f"ANÁLISE DE CUSTOS LOGÍSTICOS",
+            f"{'='*60}",
+            f"Distância Total: {costs['total_distance_km']:.2f} km",
+            f"Tempo Total: {costs['total_time_hours']:.2f} horas",
+            f"Número de Rotas: {costs['num_routes']}",
+            f"\n{'CUSTOS DETALHADOS':^60}",
+            f"{'-'*60}",
+            f"Combustível:        R$ {costs['total_fuel_cost']:>10,.2f}",
+            f"Motorista:          R$ {costs['total_driver_cost']:>10,.2f}",
+            f"Depreciação:        R$ {costs['total_depreciation_cost']:>10,.2f}",
+            f"Pedágios:           R$ {costs['total_toll_cost']:>10,.2f}",
+            f"Operacional:        R$ {costs['total_operational_cost']:>10,.2f}",
+            f"{'-'*60}",
+            f"CUSTO TOTAL:        R$ {costs['total_cost']:>10,.2f}",
+            f"{'-'*60}",
+            f"Custo por km:       R$ {costs['cost_per_km']:>10,.2f}",
+            f"Custo por rota:     R$ {costs['average_cost_per_route']:>10,.2f}",
+            f"\n{'IMPACTO AMBIENTAL':^60}",
+            f"{'-'*60}",
+            f"Emissões CO2:       {costs['total_co2_kg']:>10,.2f} kg",
+            f"{'='*60}\n"
+        ]
+        
+        # Uma única escrita em vez de uma chamada de print por linha
+        sys.stdout.write("\n".join(lines) + "\n")
 
@@ -3,10 +3,15 @@ Módulo de Manipulação de Dados
 Processamento de endereços, coordenadas e dados de entrada
 """
 
+import csv
+import io
+
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Optional
-from math import radians, cos, sin, asin, sqrt
+from typing import List, Tuple, Dict, Optional, Union
+from math import pi, cos, sin, asin, sqrt
+
+from modules import _numba_kernels
 
 
 class DataHandler:
@@ -14,6 +19,17 @@ class DataHandler:
     Classe para manipular dados de entrada do sistema de otimização.
     """
     
+    # Raio médio da Terra em metros
+    EARTH_RADIUS_METERS = 6371000
+    _EARTH_DIAMETER_METERS = 2.0 * EARTH_RADIUS_METERS
+    _DEG_TO_RAD = pi / 180.0
+    
+    # Troca de separadores para o padrão brasileiro (1,234.56 -> 1.234,56)
+    _CURRENCY_TRANSLATION = str.maketrans({',': '.', '.': ','})
+    
+    # A partir deste número de localizações usa-se o kernel Numba (se instalado)
+    NUMBA_MIN_LOCATIONS = 200
+    
     @staticmethod
     def haversine_distance(
         lat1: float, lon1: float, 
@@ -29,19 +45,16 @@ class DataHandler:
         Returns:
             Distância em metros
         """
-        # Converter para radianos
-        lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+        # Converter para radianos direto, sem montar uma lista intermediária
+        lat1 *= DataHandler._DEG_TO_RAD
+        lat2 *= DataHandler._DEG_TO_RAD
         
         # Fórmula de Haversine
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        
-        # Raio da Terra em metros
-        r = 6371000
+        sin_dlat = sin((lat2 - lat1) * 0.5)
+        sin_dlon = sin((lon2 - lon1) * DataHandler._DEG_TO_RAD * 0.5)
+        a = sin_dlat * sin_dlat + cos(lat1) * cos(lat2) * sin_dlon * sin_dlon
         
-        return c * r
+        return DataHandler._EARTH_DIAMETER_METERS * asin(sqrt(a))
     
     @staticmethod
     def euclidean_distance(x1: float, y1: float, x2: float, y2: float) -> float:
@@ -59,42 +72,139 @@ class DataHandler:
     
     @staticmethod
     def create_distance_matrix(
-        locations: List[Tuple[float, float]],
-        method: str = 'haversine'
+        locations: Union[List[Tuple[float, float]], np.ndarray],
+        method: str = 'haversine',
+        dtype: Optional[np.dtype] = None
     ) -> np.ndarray:
         """
         Cria uma matriz de distâncias entre localizações.
         
         Args:
-            locations: Lista de tuplas (latitude, longitude) ou (x, y)
+            locations: Lista de tuplas ou array (N, 2) com (latitude, longitude) ou (x, y)
             method: Método de cálculo ('haversine' ou 'euclidean')
+            dtype: Tipo da matriz. Por padrão, metros inteiros em int32 para
+                'haversine' (o OR-Tools trabalha com inteiros e cabe com folga
+                em 32 bits) e float64 para 'euclidean'. Tipos inteiros são
+                arredondados para o valor mais próximo.
             
         Returns:
             Matriz de distâncias numpy array
         """
-        n = len(locations)
-        distance_matrix = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    distance_matrix[i][j] = 0
-                else:
-                    if method == 'haversine':
-                        distance_matrix[i][j] = DataHandler.haversine_distance(
-                            locations[i][0], locations[i][1],
-                            locations[j][0], locations[j][1]
-                        )
-                    elif method == 'euclidean':
-                        distance_matrix[i][j] = DataHandler.euclidean_distance(
-                            locations[i][0], locations[i][1],
-                            locations[j][0], locations[j][1]
-                        )
-                    else:
-                        raise ValueError(f"Método '{method}' não suportado")
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        
+        if method == 'haversine':
+            dtype = np.dtype(np.int32 if dtype is None else dtype)
+            if _numba_kernels.NUMBA_AVAILABLE and len(points) > DataHandler.NUMBA_MIN_LOCATIONS:
+                return DataHandler._haversine_matrix_numba(points[:, 0], points[:, 1], dtype)
+            distance_matrix = DataHandler._haversine_matrix(points[:, 0], points[:, 1])
+        elif method == 'euclidean':
+            dtype = np.dtype(np.float64 if dtype is None else dtype)
+            distance_matrix = DataHandler._euclidean_matrix(points[:, 0], points[:, 1])
+        else:
+            raise ValueError(f"Método '{method}' não suportado")
+        
+        if np.issubdtype(dtype, np.integer):
+            np.rint(distance_matrix, out=distance_matrix)
+        return distance_matrix.astype(dtype, copy=False)
+    
+    @staticmethod
+    def _haversine_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Calcula a matriz de distâncias de Haversine de forma vetorizada.
         
+        Usa broadcasting entre vetores (N, 1) e (1, N) para calcular todos
+        os pares de uma só vez, sem laços em Python. As operações são feitas
+        in-place sobre dois buffers (N, N), sem matrizes temporárias extras.
+        
+        Args:
+            lats: Latitudes em graus
+            lons: Longitudes em graus
+            
+        Returns:
+            Matriz (N, N) de distâncias em metros
+        """
+        half_lat = np.deg2rad(lats) / 2
+        half_lon = np.deg2rad(lons) / 2
+        n = len(half_lat)
+        
+        # Funções trigonométricas calculadas uma única vez por ponto (O(N));
+        # os senos das diferenças saem de
+        # sin(x - y) = cos x cos y (tan x - tan y), válido pois |x|, |y| < 90°
+        cos_lat = np.cos(2 * half_lat)
+        tan_half_lat, cos_half_lat = np.tan(half_lat), np.cos(half_lat)
+        tan_half_lon, cos_half_lon = np.tan(half_lon), np.cos(half_lon)
+        
+        a = np.empty((n, n))
+        tmp = np.empty((n, n))
+        
+        # a = sin²(dlat / 2)
+        np.subtract(tan_half_lat[:, None], tan_half_lat[None, :], out=a)
+        a *= cos_half_lat[:, None]
+        a *= cos_half_lat[None, :]
+        a *= a
+        
+        # a += cos(lat_i) cos(lat_j) sin²(dlon / 2)
+        np.subtract(tan_half_lon[:, None], tan_half_lon[None, :], out=tmp)
+        tmp *= cos_half_lon[:, None]
+        tmp *= cos_half_lon[None, :]
+        tmp *= tmp
+        tmp *= cos_lat[:, None]
+        tmp *= cos_lat[None, :]
+        a += tmp
+        del tmp
+        
+        # Limitar a 1 para evitar NaN por erros de arredondamento
+        np.minimum(a, 1.0, out=a)
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * DataHandler.EARTH_RADIUS_METERS
+        
+        return a
+    
+    @staticmethod
+    def _haversine_matrix_numba(
+        lats: np.ndarray,
+        lons: np.ndarray,
+        dtype: np.dtype = np.dtype(np.float64)
+    ) -> np.ndarray:
+        """
+        Calcula a matriz de distâncias de Haversine com o kernel Numba.
+        
+        Escreve direto na matriz de saída (já no tipo final) em um único laço
+        paralelo, sem as matrizes temporárias (N, N) da versão vetorizada.
+        
+        Args:
+            lats: Latitudes em graus
+            lons: Longitudes em graus
+            dtype: Tipo da matriz de saída (inteiros são arredondados)
+            
+        Returns:
+            Matriz (N, N) de distâncias em metros
+        """
+        n = len(lats)
+        distance_matrix = np.empty((n, n), dtype=dtype)
+        _numba_kernels.haversine_matrix(
+            np.deg2rad(lats), np.deg2rad(lons),
+            float(DataHandler.EARTH_RADIUS_METERS),
+            np.issubdtype(dtype, np.integer),
+            distance_matrix
+        )
         return distance_matrix
     
+    @staticmethod
+    def _euclidean_matrix(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calcula a matriz de distâncias euclidianas de forma vetorizada.
+        
+        Args:
+            xs: Coordenadas x
+            ys: Coordenadas y
+            
+        Returns:
+            Matriz (N, N) de distâncias euclidianas
+        """
+        return np.hypot(xs[None, :] - xs[:, None], ys[None, :] - ys[:, None])
+    
     @staticmethod
     def load_locations_from_csv(
         filepath: str,
@@ -107,24 +217,44 @@ class DataHandler:
         Carrega localizações de um arquivo CSV.
         
         Args:
-            filepath: Caminho do arquivo CSV
+            filepath: Caminho do arquivo CSV ou objeto de arquivo (ex.: upload)
             lat_column: Nome da coluna de latitude
             lon_column: Nome da coluna de longitude
             name_column: Nome da coluna de identificação
             demand_column: Nome da coluna de demanda (opcional)
             
         Returns:
-            Dicionário com dados processados
+            Dicionário com dados processados ('locations' como array (N, 2)
+            e 'dataframe' apenas com as colunas usadas)
         """
-        df = pd.read_csv(filepath)
-        
-        # Validar colunas
+        # O arquivo é lido duas vezes (cabeçalho e dados): objetos de arquivo,
+        # que podem não permitir voltar ao início, são copiados para a memória
+        content = None
+        if hasattr(filepath, 'read'):
+            content = filepath.read()
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+        
+        def source():
+            return filepath if content is None else io.BytesIO(content)
+        
+        # Validar colunas lendo apenas o cabeçalho
+        header = pd.read_csv(source(), nrows=0).columns
         required_columns = [lat_column, lon_column, name_column]
         for col in required_columns:
-            if col not in df.columns:
+            if col not in header:
                 raise ValueError(f"Coluna '{col}' não encontrada no CSV")
         
-        locations = list(zip(df[lat_column], df[lon_column]))
+        # Ler só as colunas usadas, com o leitor multithread do pyarrow se houver;
+        # coordenadas já em float64 (sem inferência de tipo nem conversão depois)
+        usecols = required_columns + ([demand_column] if demand_column in header else [])
+        dtype = {lat_column: np.float64, lon_column: np.float64}
+        try:
+            df = pd.read_csv(source(), engine='pyarrow', usecols=usecols, dtype=dtype)
+        except ImportError:  # pyarrow é uma dependência opcional
+            df = pd.read_csv(source(), usecols=usecols, dtype=dtype, memory_map=content is None)
+        
+        locations = np.ascontiguousarray(df[[lat_column, lon_column]].to_numpy(dtype=np.float64))
         names = df[name_column].tolist()
         
         result = {
@@ -157,7 +287,7 @@ class DataHandler:
             demand_column: Nome da coluna de demanda (opcional)
             
         Returns:
-            Dicionário com dados processados
+            Dicionário com dados processados ('locations' como array (N, 2))
         """
         # Validar colunas
         required_columns = [lat_column, lon_column, name_column]
@@ -165,7 +295,7 @@ class DataHandler:
             if col not in df.columns:
                 raise ValueError(f"Coluna '{col}' não encontrada no DataFrame")
         
-        locations = list(zip(df[lat_column], df[lon_column]))
+        locations = np.ascontiguousarray(df[[lat_column, lon_column]].to_numpy(dtype=np.float64))
         names = df[name_column].tolist()
         
         result = {
@@ -196,28 +326,24 @@ class DataHandler:
             include_demands: Se deve incluir demandas aleatórias
             
         Returns:
-            Dicionário com dados de exemplo
+            Dicionário com dados de exemplo ('locations' como array (N, 2))
         """
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
+        num_customers = num_locations - 1
         
         # Converter raio para graus (aproximadamente)
         radius_deg = radius_km / 111.0  # 1 grau ≈ 111 km
         
-        locations = [depot_location]
-        names = ['Depósito']
+        # Gerar ângulos e raios aleatórios de todos os clientes de uma vez
+        angle = rng.uniform(0, 2 * np.pi, num_customers)
+        r = rng.uniform(0, radius_deg, num_customers)
         
-        # Gerar localizações aleatórias ao redor do depósito
-        for i in range(1, num_locations):
-            # Gerar ângulo e raio aleatórios
-            angle = np.random.uniform(0, 2 * np.pi)
-            r = np.random.uniform(0, radius_deg)
-            
-            # Calcular nova posição
-            lat = depot_location[0] + r * np.cos(angle)
-            lon = depot_location[1] + r * np.sin(angle)
-            
-            locations.append((lat, lon))
-            names.append(f'Cliente {i}')
+        locations = np.empty((num_locations, 2), dtype=np.float64)
+        locations[0] = depot_location
+        locations[1:, 0] = depot_location[0] + r * np.cos(angle)
+        locations[1:, 1] = depot_location[1] + r * np.sin(angle)
+        
+        names = ['Depósito'] + [f'Cliente {i}' for i in range(1, num_locations)]
         
         result = {
             'locations': locations,
@@ -226,28 +352,25 @@ class DataHandler:
         
         if include_demands:
             # Depósito tem demanda 0, clientes têm demandas aleatórias
-            demands = [0] + list(np.random.randint(1, 20, num_locations - 1))
+            demands = [0] + rng.integers(1, 20, num_customers).tolist()
             result['demands'] = demands
         
         return result
     
     @staticmethod
-    def validate_locations(locations: List[Tuple[float, float]]) -> bool:
+    def validate_locations(locations: Union[List[Tuple[float, float]], np.ndarray]) -> bool:
         """
         Valida se as coordenadas são válidas.
         
         Args:
-            locations: Lista de tuplas (latitude, longitude)
+            locations: Lista de tuplas ou array (N, 2) com (latitude, longitude)
             
         Returns:
             True se válido, False caso contrário
         """
-        for lat, lon in locations:
-            if not (-90 <= lat <= 90):
-                return False
-            if not (-180 <= lon <= 180):
-                return False
-        return True
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        lat, lon = points[:, 0], points[:, 1]
+        return bool(((lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)).all())
     
     @staticmethod
     def create_dataframe_from_routes(
@@ -268,23 +391,36 @@ class DataHandler:
         Returns:
             DataFrame com informações das rotas
         """
-        data = []
-        
-        for vehicle_id, route in enumerate(routes):
-            for seq, location_idx in enumerate(route):
-                row = {
-                    'veiculo': vehicle_id + 1,
-                    'sequencia': seq,
-                    'localizacao_id': location_idx,
-                    'nome': names[location_idx] if location_idx < len(names) else f'Local {location_idx}',
-                    'latitude': locations[location_idx][0],
-                    'longitude': locations[location_idx][1]
-                }
-                
-                if route_distances:
-                    row['distancia_rota_km'] = route_distances[vehicle_id] / 1000
-                
-                data.append(row)
+        route_lengths = [len(route) for route in routes]
+        if sum(route_lengths) == 0:
+            return pd.DataFrame()
+        
+        # Índices de todas as paradas de uma vez (veículo, sequência, local)
+        vehicle_idx = np.repeat(np.arange(len(routes)), route_lengths)
+        location_idx = np.concatenate(routes).astype(np.intp)
+        route_starts = np.cumsum(route_lengths) - route_lengths
+        sequence = np.arange(len(location_idx)) - np.repeat(route_starts, route_lengths)
+        
+        # Localizações sem nome recebem 'Local {índice}'
+        names_arr = np.asarray(names, dtype=object)
+        max_idx = int(location_idx.max())
+        if max_idx >= len(names_arr):
+            missing = [f'Local {idx}' for idx in range(len(names_arr), max_idx + 1)]
+            names_arr = np.concatenate([names_arr, np.asarray(missing, dtype=object)])
+        
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        
+        data = {
+            'veiculo': vehicle_idx + 1,
+            'sequencia': sequence,
+            'localizacao_id': location_idx,
+            'nome': names_arr[location_idx],
+            'latitude': points[location_idx, 0],
+            'longitude': points[location_idx, 1]
+        }
+        
+        if route_distances is not None and len(route_distances) > 0:
+            data['distancia_rota_km'] = np.asarray(route_distances, dtype=np.float64)[vehicle_idx] / 1000
         
         return pd.DataFrame(data)
     
@@ -306,10 +442,23 @@ class DataHandler:
             filepath: Caminho do arquivo de saída
             route_distances: Lista de distâncias das rotas (opcional)
         """
-        df = DataHandler.create_dataframe_from_routes(
-            routes, names, locations, route_distances
-        )
-        df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        include_distances = route_distances is not None and len(route_distances) > 0
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        
+        header = ['veiculo', 'sequencia', 'localizacao_id', 'nome', 'latitude', 'longitude']
+        if include_distances:
+            header.append('distancia_rota_km')
+        
+        # Escrever as linhas direto no arquivo, sem montar um DataFrame
+        with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(header)
+            for vehicle_id, route in enumerate(routes):
+                extra = (route_distances[vehicle_id] / 1000,) if include_distances else ()
+                for sequence, location_idx in enumerate(route):
+                    name = names[location_idx] if location_idx < len(names) else f'Local {location_idx}'
+                    lat, lon = points[location_idx].tolist()
+                    writer.writerow((vehicle_id + 1, sequence, location_idx, name, lat, lon) + extra)
     
     @staticmethod
     def format_distance(distance_meters: float) -> str:
@@ -357,5 +506,4 @@ class DataHandler:
         Returns:
             String formatada
         """
-        return f"R$ {value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
-
+        return f"R$ {value:,.2f}".translate(DataHandler._CURRENCY_TRANSLATION)
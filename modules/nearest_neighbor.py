@@ -6,6 +6,8 @@ Heurística simples e rápida para VRP
 import numpy as np
 from typing import List, Dict
 
+from modules import _numba_kernels
+
 
 class NearestNeighborOptimizer:
     """
@@ -15,6 +17,9 @@ class NearestNeighborOptimizer:
     o cliente mais próximo não visitado.
     """
     
+    # A partir deste tamanho, usar o kernel Numba (se disponível)
+    NUMBA_MIN_LOCATIONS = 200
+    
     def __init__(
         self,
         distance_matrix: np.ndarray,
@@ -55,15 +60,30 @@ class NearestNeighborOptimizer:
         import time
         start_time = time.time()
         
-        # Conjunto de clientes não visitados
-        unvisited = set(range(self.num_locations))
-        unvisited.remove(self.depot_index)
+        if _numba_kernels.NUMBA_AVAILABLE and self.num_locations > self.NUMBA_MIN_LOCATIONS:
+            self.solution = self._solve_numba()
+            self.execution_time = time.time() - start_time
+            return True
+        
+        # Máscara de localizações visitadas (o depósito nunca é candidato)
+        visited = np.zeros(self.num_locations, dtype=bool)
+        visited[self.depot_index] = True
+        num_unvisited = self.num_locations - 1
+        
+        distance_matrix = np.asarray(self.distance_matrix)
+        row = np.empty(self.num_locations, dtype=np.float64)
+        
+        def find_nearest(current_location):
+            # Copiar a linha para o buffer e excluir os já visitados
+            np.copyto(row, distance_matrix[current_location])
+            row[visited] = np.inf
+            return int(np.argmin(row))
         
         routes = []
         
         # Construir rota para cada veículo
         for vehicle_id in range(self.num_vehicles):
-            if not unvisited:
+            if num_unvisited == 0:
                 break
             
             route = [self.depot_index]
@@ -71,16 +91,14 @@ class NearestNeighborOptimizer:
             customers_in_route = 0
             
             # Construir rota escolhendo sempre o mais próximo
-            while unvisited and customers_in_route < self.max_customers_per_route:
+            while num_unvisited > 0 and customers_in_route < self.max_customers_per_route:
                 # Encontrar cliente mais próximo não visitado
-                nearest_customer = min(
-                    unvisited,
-                    key=lambda x: self.distance_matrix[current_location][x]
-                )
+                nearest_customer = find_nearest(current_location)
                 
                 # Adicionar à rota
                 route.append(nearest_customer)
-                unvisited.remove(nearest_customer)
+                visited[nearest_customer] = True
+                num_unvisited -= 1
                 current_location = nearest_customer
                 customers_in_route += 1
             
@@ -96,6 +114,33 @@ class NearestNeighborOptimizer:
         
         return True
     
+    def _solve_numba(self) -> List[List[int]]:
+        """
+        Constrói as rotas com o kernel Numba.
+        
+        Returns:
+            Lista de rotas (apenas as que atendem clientes)
+        """
+        order = np.empty(self.num_locations - 1, dtype=np.int64)
+        route_sizes = np.empty(self.num_vehicles, dtype=np.int64)
+        _numba_kernels.nearest_neighbor_routes(
+            np.ascontiguousarray(self.distance_matrix),
+            self.depot_index,
+            self.num_vehicles,
+            self.max_customers_per_route,
+            order,
+            route_sizes
+        )
+        
+        routes = []
+        start = 0
+        for size in route_sizes.tolist():
+            if size > 0:
+                customers = order[start:start + size].tolist()
+                routes.append([self.depot_index] + customers + [self.depot_index])
+                start += size
+        return routes
+    
     def get_routes(self) -> List[List[int]]:
         """
         Retorna as rotas da solução.
@@ -115,10 +160,9 @@ class NearestNeighborOptimizer:
         Returns:
             Distância total da rota
         """
-        distance = 0
-        for i in range(len(route) - 1):
-            distance += self.distance_matrix[route[i]][route[i + 1]]
-        return distance
+        stops = np.asarray(route, dtype=np.intp)
+        distance_matrix = np.asarray(self.distance_matrix)
+        return float(distance_matrix[stops[:-1], stops[1:]].sum())
     
     def get_metrics(self) -> Dict:
         """
@@ -131,14 +175,18 @@ class NearestNeighborOptimizer:
             return {}
         
         routes = self.solution
-        route_distances = []
-        total_distance = 0
-        
-        for route in routes:
-            distance = self.get_route_distance(route)
-            route_distances.append(distance)
-            total_distance += distance
         
+        # Todos os trechos de todas as rotas em uma única indexação
+        route_lengths = np.array([len(route) for route in routes])
+        route_starts = np.cumsum(route_lengths) - route_lengths
+        stops = np.concatenate(routes).astype(np.intp)
+        distance_matrix = np.asarray(self.distance_matrix)
+        legs = distance_matrix[stops[:-1], stops[1:]].astype(np.float64)
+        # Descartar as ligações entre o fim de uma rota e o início da próxima
+        legs[route_starts[1:] - 1] = 0
+        route_distances = np.add.reduceat(legs, route_starts).tolist()
+        
+        total_distance = sum(route_distances)
         max_route_distance = max(route_distances) if route_distances else 0
         
         return {
@@ -3,6 +3,9 @@ Módulo de Otimização de Rotas usando OR-Tools
 Sistema de Otimização Logística para o Brasil
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 import numpy as np
@@ -15,6 +18,31 @@ class VRPOptimizer:
     usando Google OR-Tools.
     """
     
+    # Peso da maior rota no objetivo (equilibra as rotas entre veículos)
+    SPAN_COST_COEFFICIENT = 100
+    
+    # Maior número de localizações (incluindo o depósito) em que vale a pena
+    # tentar o solver exato (CP-SAT), para 1, 2, 3 e 4 ou mais veículos:
+    # cada veículo a mais multiplica as rotas possíveis e, até estes
+    # limites, a prova de otimalidade leva frações de segundo
+    EXACT_MAX_LOCATIONS = (12, 10, 9, 7)
+    
+    # Tempo máximo da tentativa exata antes de recorrer à metaheurística
+    EXACT_TIME_LIMIT_SECONDS = 1
+    
+    # Combinações (estratégia inicial, metaheurística) de cada processo do
+    # solve_parallel, da mais para a menos promissora
+    MULTISTART_CONFIGS = [
+        ('PATH_CHEAPEST_ARC', 'GUIDED_LOCAL_SEARCH'),
+        ('PARALLEL_CHEAPEST_INSERTION', 'GUIDED_LOCAL_SEARCH'),
+        ('SAVINGS', 'GUIDED_LOCAL_SEARCH'),
+        ('PATH_CHEAPEST_ARC', 'TABU_SEARCH'),
+        ('CHRISTOFIDES', 'GUIDED_LOCAL_SEARCH'),
+        ('LOCAL_CHEAPEST_INSERTION', 'SIMULATED_ANNEALING'),
+        ('SWEEP', 'GUIDED_LOCAL_SEARCH'),
+        ('PATH_MOST_CONSTRAINED_ARC', 'GENERIC_TABU_SEARCH'),
+    ]
+    
     def __init__(
         self,
         distance_matrix: np.ndarray,
@@ -23,7 +51,8 @@ class VRPOptimizer:
         vehicle_capacities: Optional[List[int]] = None,
         demands: Optional[List[int]] = None,
         time_windows: Optional[List[Tuple[int, int]]] = None,
-        max_distance_per_vehicle: int = 100000
+        max_distance_per_vehicle: int = 100000,
+        enable_callback_cache: bool = False
     ):
         """
         Inicializa o otimizador VRP.
@@ -36,6 +65,10 @@ class VRPOptimizer:
             demands: Lista com demanda de cada localização (opcional)
             time_windows: Lista de tuplas (início, fim) para janelas de tempo (opcional)
             max_distance_per_vehicle: Distância máxima por veículo em metros
+            enable_callback_cache: Se o OR-Tools deve pré-calcular e guardar os
+                valores das funções de trânsito para todos os pares de nós
+                (memória O(N²) por função; as matrizes registradas já são
+                consultadas em C++, então o ganho costuma ser pequeno)
         """
         self.distance_matrix = distance_matrix
         self.num_vehicles = num_vehicles
@@ -44,16 +77,61 @@ class VRPOptimizer:
         self.demands = demands
         self.time_windows = time_windows
         self.max_distance_per_vehicle = max_distance_per_vehicle
+        self.enable_callback_cache = enable_callback_cache
         self.num_locations = len(distance_matrix)
         
         # Validações
         self._validate_inputs()
         
+        # O OR-Tools trabalha com distâncias inteiras: converter uma única vez,
+        # em int32 sempre que os valores couberem (metade da memória do int64)
+        int_dtype = np.int32 if np.max(distance_matrix) < 2**31 else np.int64
+        self.distance_matrix_int = np.ascontiguousarray(distance_matrix, dtype=int_dtype)
+        self._dm_list = self.distance_matrix_int.tolist()
+        # Com distâncias inteiras, a dimensão 'Distance' do OR-Tools já tem
+        # as distâncias exatas das rotas
+        self._integer_distances = np.issubdtype(np.asarray(distance_matrix).dtype, np.integer)
+        self._data_model = None
+        
         # Objetos do OR-Tools
         self.manager = None
         self.routing = None
         self.solution = None
+        self.algorithm = 'OR-Tools'
+        self.is_optimal = False
+        self.best_config = None
         
+    @staticmethod
+    def suggest_time_limit(num_locations: int) -> int:
+        """
+        Sugere um tempo limite de busca proporcional ao porte da instância.
+        
+        A Guided Local Search converge em poucos segundos para instâncias
+        pequenas e precisa de mais tempo nas grandes; o tempo cresce com N²
+        entre 2 e 120 segundos.
+        
+        Args:
+            num_locations: Número de localizações (incluindo depósito)
+            
+        Returns:
+            Tempo limite sugerido em segundos
+        """
+        return int(max(2, min(120, 0.05 * num_locations * num_locations / 100)))
+    
+    @staticmethod
+    def exact_max_locations(num_vehicles: int) -> int:
+        """
+        Retorna o maior porte de instância indicado para o solver exato.
+        
+        Args:
+            num_vehicles: Número de veículos disponíveis
+            
+        Returns:
+            Número máximo de localizações (incluindo depósito)
+        """
+        limits = VRPOptimizer.EXACT_MAX_LOCATIONS
+        return limits[min(max(num_vehicles, 1), len(limits)) - 1]
+    
     def _validate_inputs(self):
         """Valida os dados de entrada."""
         if self.distance_matrix.shape[0] != self.distance_matrix.shape[1]:
@@ -69,9 +147,17 @@ class VRPOptimizer:
             raise ValueError("Número de demandas deve corresponder ao número de localizações")
     
     def _create_data_model(self) -> Dict:
-        """Cria o modelo de dados para o OR-Tools."""
+        """
+        Cria o modelo de dados para o OR-Tools.
+        
+        O modelo é montado uma única vez e reaproveitado nas próximas
+        construções do modelo de roteamento (solve, solve_exact, ...).
+        """
+        if self._data_model is not None:
+            return self._data_model
+        
         data = {
-            'distance_matrix': self.distance_matrix.tolist(),
+            'distance_matrix': self._dm_list,
             'num_vehicles': self.num_vehicles,
             'depot': self.depot_index
         }
@@ -80,76 +166,38 @@ class VRPOptimizer:
             data['vehicle_capacities'] = self.vehicle_capacities
         
         if self.demands:
-            data['demands'] = self.demands
+            # Inteiros Python, no formato aceito pelo RegisterUnaryTransitVector
+            data['demands'] = [int(demand) for demand in self.demands]
         
         if self.time_windows:
             data['time_windows'] = self.time_windows
         
+        self._data_model = data
         return data
     
-    def _distance_callback(self, from_index: int, to_index: int) -> int:
-        """
-        Retorna a distância entre dois nós.
-        
-        Args:
-            from_index: Índice de origem
-            to_index: Índice de destino
-            
-        Returns:
-            Distância entre os nós
-        """
-        from_node = self.manager.IndexToNode(from_index)
-        to_node = self.manager.IndexToNode(to_index)
-        return int(self.distance_matrix[from_node][to_node])
-    
-    def _demand_callback(self, from_index: int) -> int:
-        """
-        Retorna a demanda de um nó.
-        
-        Args:
-            from_index: Índice do nó
-            
-        Returns:
-            Demanda do nó
-        """
-        from_node = self.manager.IndexToNode(from_index)
-        return self.demands[from_node]
-    
-    def solve(
-        self,
-        time_limit_seconds: int = 30,
-        strategy: str = 'PATH_CHEAPEST_ARC',
-        local_search: Optional[str] = 'GUIDED_LOCAL_SEARCH'
-    ) -> bool:
-        import time
-        start_time = time.time()
-        """
-        Resolve o problema de roteamento.
-        
-        Args:
-            time_limit_seconds: Tempo limite para busca em segundos
-            strategy: Estratégia de primeira solução
-            local_search: Metaheurística de busca local
-            
-        Returns:
-            True se encontrou solução, False caso contrário
-        """
+    def _build_routing_model(self):
+        """Cria o index manager, o modelo de roteamento e suas dimensões."""
         data = self._create_data_model()
         
         # Criar o index manager
         self.manager = pywrapcp.RoutingIndexManager(
-            len(data['distance_matrix']),
+            self.num_locations,
             data['num_vehicles'],
             data['depot']
         )
         
         # Criar o modelo de roteamento
-        self.routing = pywrapcp.RoutingModel(self.manager)
-        
-        # Registrar callback de distância
-        transit_callback_index = self.routing.RegisterTransitCallback(
-            lambda from_index, to_index: self._distance_callback(from_index, to_index)
-        )
+        model_parameters = pywrapcp.DefaultRoutingModelParameters()
+        # Veículos homogêneos compartilham o mesmo modelo de custo
+        model_parameters.reduce_vehicle_cost_model = True
+        if self.enable_callback_cache:
+            # O cache é usado quando o número de nós não passa deste limite
+            model_parameters.max_callback_cache_size = self.num_locations
+        self.routing = pywrapcp.RoutingModel(self.manager, model_parameters)
+        
+        # Registrar a matriz de distâncias (lista de listas de inteiros) direto
+        # no C++, sem callback Python
+        transit_callback_index = self.routing.RegisterTransitMatrix(data['distance_matrix'])
         
         # Definir custo de arco
         self.routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
@@ -165,13 +213,11 @@ class VRPOptimizer:
         )
         distance_dimension = self.routing.GetDimensionOrDie(dimension_name)
         # Definir custo para minimizar a maior rota
-        distance_dimension.SetGlobalSpanCostCoefficient(100)
+        distance_dimension.SetGlobalSpanCostCoefficient(self.SPAN_COST_COEFFICIENT)
         
         # Adicionar restrições de capacidade se fornecidas
         if self.vehicle_capacities and self.demands:
-            demand_callback_index = self.routing.RegisterUnaryTransitCallback(
-                lambda from_index: self._demand_callback(from_index)
-            )
+            demand_callback_index = self.routing.RegisterUnaryTransitVector(data['demands'])
             self.routing.AddDimensionWithVehicleCapacity(
                 demand_callback_index,
                 0,  # sem folga de capacidade
@@ -179,12 +225,19 @@ class VRPOptimizer:
                 True,  # começar acumulado em zero
                 'Capacity'
             )
-        
-        # Configurar parâmetros de busca
+    
+    def _create_search_parameters(
+        self,
+        time_limit_seconds: int,
+        strategy: str,
+        local_search: Optional[str]
+    ):
+        """Cria os parâmetros de busca do OR-Tools."""
         search_parameters = pywrapcp.DefaultRoutingSearchParameters()
         
         # Estratégia de primeira solução
         strategy_map = {
+            'AUTOMATIC': routing_enums_pb2.FirstSolutionStrategy.AUTOMATIC,
             'PATH_CHEAPEST_ARC': routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC,
             'PATH_MOST_CONSTRAINED_ARC': routing_enums_pb2.FirstSolutionStrategy.PATH_MOST_CONSTRAINED_ARC,
             'SAVINGS': routing_enums_pb2.FirstSolutionStrategy.SAVINGS,
@@ -217,8 +270,38 @@ class VRPOptimizer:
         # Configurações adicionais para melhorar a busca
         search_parameters.log_search = False
         
+        return search_parameters
+    
+    def solve(
+        self,
+        time_limit_seconds: int = 30,
+        strategy: str = 'AUTOMATIC',
+        local_search: Optional[str] = 'GUIDED_LOCAL_SEARCH'
+    ) -> bool:
+        """
+        Resolve o problema de roteamento.
+        
+        Args:
+            time_limit_seconds: Tempo limite para busca em segundos
+            strategy: Estratégia de primeira solução ('AUTOMATIC' deixa o
+                OR-Tools escolher)
+            local_search: Metaheurística de busca local
+            
+        Returns:
+            True se encontrou solução, False caso contrário
+        """
+        import time
+        start_time = time.time()
+        
+        self._build_routing_model()
+        search_parameters = self._create_search_parameters(
+            time_limit_seconds, strategy, local_search
+        )
+        
         # Resolver o problema
         self.solution = self.routing.SolveWithParameters(search_parameters)
+        self.algorithm = 'OR-Tools'
+        self.is_optimal = False
         
         # Armazenar tempo de execução
         self.execution_time = time.time() - start_time
@@ -226,6 +309,226 @@ class VRPOptimizer:
         # Retornar se encontrou solução
         return self.solution is not None
     
+    def solve_exact(self, time_limit_seconds: int = 30, require_optimal: bool = False) -> bool:
+        """
+        Resolve o problema de forma exata com o CP-SAT.
+        
+        Indicado para instâncias pequenas (até exact_max_locations
+        localizações para a frota). Usa o mesmo objetivo do modelo de
+        roteamento (distância total mais o custo da maior rota) e as mesmas
+        restrições de distância e capacidade. Se o tempo acabar antes da prova de
+        otimalidade, a melhor solução do CP-SAT costuma ser pior que a da
+        metaheurística; com require_optimal=True ela é descartada.
+        
+        Args:
+            time_limit_seconds: Tempo limite para busca em segundos
+            require_optimal: Só aceita a solução se a otimalidade for provada
+            
+        Returns:
+            True se encontrou solução (ótima, se require_optimal), False caso contrário
+        """
+        import time
+        from ortools.sat.python import cp_model
+        start_time = time.time()
+        
+        n = self.num_locations
+        depot = self.depot_index
+        distances = self._dm_list
+        customers = [i for i in range(n) if i != depot]
+        use_capacity = bool(self.vehicle_capacities and self.demands)
+        
+        model = cp_model.CpModel()
+        arc_vars = []
+        visit_vars = []
+        used_vars = []
+        route_distances = []
+        
+        for vehicle_id in range(self.num_vehicles):
+            used = model.NewBoolVar(f'used_{vehicle_id}')
+            used_vars.append(used)
+            arcs = [(depot, depot, used.Not())]
+            vehicle_arcs = {}
+            visits = {}
+            
+            for i in customers:
+                visits[i] = model.NewBoolVar(f'visit_{vehicle_id}_{i}')
+                # Cliente fora da rota: laço em si mesmo no circuito
+                arcs.append((i, i, visits[i].Not()))
+                model.AddImplication(visits[i], used)
+            model.AddBoolOr(list(visits.values())).OnlyEnforceIf(used)
+            
+            for i in range(n):
+                for j in range(n):
+                    if i != j:
+                        arc = model.NewBoolVar(f'arc_{vehicle_id}_{i}_{j}')
+                        arcs.append((i, j, arc))
+                        vehicle_arcs[i, j] = arc
+            model.AddCircuit(arcs)
+            
+            route_distance = sum(distances[i][j] * arc for (i, j), arc in vehicle_arcs.items())
+            model.Add(route_distance <= self.max_distance_per_vehicle)
+            if use_capacity:
+                model.Add(
+                    sum(int(self.demands[i]) * visits[i] for i in customers)
+                    <= self.vehicle_capacities[vehicle_id]
+                )
+            
+            arc_vars.append(vehicle_arcs)
+            visit_vars.append(visits)
+            route_distances.append(route_distance)
+        
+        # Cada cliente é atendido por exatamente um veículo
+        for i in customers:
+            model.AddExactlyOne(visits[i] for visits in visit_vars)
+        
+        # Quebra de simetria: veículos iguais (mesma capacidade) são
+        # intercambiáveis, então cada solução aparece em várias permutações.
+        # Entre dois veículos iguais consecutivos, o primeiro é usado antes e
+        # atende o cliente de menor índice
+        first_customers = []
+        for vehicle_id, visits in enumerate(visit_vars):
+            first_customer = model.NewIntVar(0, n, f'first_{vehicle_id}')
+            # Veículo sem clientes fica com o valor n
+            model.AddMinEquality(first_customer, [n - (n - i) * visits[i] for i in customers] + [n])
+            first_customers.append(first_customer)
+        for vehicle_id in range(self.num_vehicles - 1):
+            if not use_capacity or (
+                self.vehicle_capacities[vehicle_id] == self.vehicle_capacities[vehicle_id + 1]
+            ):
+                model.AddImplication(used_vars[vehicle_id + 1], used_vars[vehicle_id])
+                model.Add(
+                    first_customers[vehicle_id] < first_customers[vehicle_id + 1]
+                ).OnlyEnforceIf(used_vars[vehicle_id + 1])
+        
+        max_route_distance = model.NewIntVar(0, self.max_distance_per_vehicle, 'max_route')
+        for route_distance in route_distances:
+            model.Add(max_route_distance >= route_distance)
+        model.Minimize(sum(route_distances) + self.SPAN_COST_COEFFICIENT * max_route_distance)
+        
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit_seconds
+        status = solver.Solve(model)
+        
+        self.solution = None
+        self.is_optimal = status == cp_model.OPTIMAL
+        accepted = (cp_model.OPTIMAL,) if require_optimal else (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        if status in accepted:
+            # Extrair a sequência de nós de cada veículo (sem o depósito)
+            routes = []
+            for vehicle_arcs in arc_vars:
+                successor = {i: j for (i, j), arc in vehicle_arcs.items() if solver.Value(arc)}
+                route = []
+                node = successor.get(depot, depot)
+                while node != depot:
+                    route.append(node)
+                    node = successor[node]
+                routes.append(route)
+            
+            self.solution = self._load_routes(routes)
+        
+        self.algorithm = 'OR-Tools (CP-SAT)'
+        self.execution_time = time.time() - start_time
+        
+        return self.solution is not None
+    
+    def solve_parallel(
+        self,
+        n_workers: Optional[int] = None,
+        time_limit_seconds: int = 30
+    ) -> bool:
+        """
+        Resolve o problema com buscas independentes em paralelo (multi-start).
+        
+        Cada processo roda uma combinação diferente de estratégia inicial e
+        metaheurística (MULTISTART_CONFIGS) com o mesmo tempo limite; fica a
+        solução de menor valor objetivo.
+        
+        Args:
+            n_workers: Número de processos (padrão: número de CPUs)
+            time_limit_seconds: Tempo limite de cada busca em segundos
+            
+        Returns:
+            True se encontrou solução, False caso contrário
+        """
+        import time
+        start_time = time.time()
+        
+        n_workers = n_workers or os.cpu_count() or 1
+        configs = self.MULTISTART_CONFIGS[:max(1, n_workers)]
+        # Os processos só precisam das distâncias inteiras (menos dados no pickle)
+        problem = (
+            self.distance_matrix_int, self.num_vehicles, self.depot_index,
+            self.vehicle_capacities, self.demands, self.time_windows,
+            self.max_distance_per_vehicle
+        )
+        
+        with ProcessPoolExecutor(max_workers=len(configs)) as executor:
+            futures = [
+                executor.submit(_solve_multistart_worker, problem, time_limit_seconds, strategy, local_search)
+                for strategy, local_search in configs
+            ]
+            results = [future.result() for future in futures]
+        
+        # Escolher a melhor busca (menor valor objetivo)
+        best = None
+        for config, result in zip(configs, results):
+            if result is not None and (best is None or result[0] < best[1][0]):
+                best = (config, result)
+        
+        self.solution = None
+        self.best_config = None
+        if best is not None:
+            self.best_config = best[0]
+            self.solution = self._load_routes(best[1][1])
+        
+        self.algorithm = 'OR-Tools (multi-start)'
+        self.is_optimal = False
+        self.execution_time = time.time() - start_time
+        
+        return self.solution is not None
+    
+    def _get_vehicle_sequences(self) -> List[List[int]]:
+        """
+        Extrai a sequência de clientes de cada veículo (sem o depósito).
+        
+        Returns:
+            Lista com uma sequência por veículo (vazia se o veículo não sai)
+        """
+        is_end = self.routing.IsEnd
+        next_var = self.routing.NextVar
+        value = self.solution.Value
+        index_to_node = self.manager.IndexToNode
+        
+        sequences = []
+        for vehicle_id in range(self.num_vehicles):
+            index = value(next_var(self.routing.Start(vehicle_id)))
+            sequence = []
+            while not is_end(index):
+                sequence.append(index_to_node(index))
+                index = value(next_var(index))
+            sequences.append(sequence)
+        return sequences
+    
+    def _load_routes(self, routes: List[List[int]]):
+        """
+        Carrega rotas calculadas fora do modelo de roteamento (CP-SAT ou
+        processos paralelos) para reaproveitar get_routes / get_metrics.
+        
+        Args:
+            routes: Sequência de clientes de cada veículo (sem o depósito)
+            
+        Returns:
+            Assignment do OR-Tools com as rotas, ou None se forem inválidas
+        """
+        self._build_routing_model()
+        self.routing.CloseModelWithParameters(
+            self._create_search_parameters(1, 'PATH_CHEAPEST_ARC', None)
+        )
+        return self.routing.ReadAssignmentFromRoutes(
+            [[self.manager.NodeToIndex(node) for node in route] for route in routes],
+            True
+        )
+    
     def get_routes(self) -> List[List[int]]:
         """
         Extrai as rotas da solução.
@@ -236,18 +539,24 @@ class VRPOptimizer:
         if not self.solution:
             return []
         
+        # Métodos usados no laço guardados em variáveis locais
+        start = self.routing.Start
+        is_end = self.routing.IsEnd
+        next_var = self.routing.NextVar
+        value = self.solution.Value
+        index_to_node = self.manager.IndexToNode
+        
         routes = []
         for vehicle_id in range(self.num_vehicles):
-            index = self.routing.Start(vehicle_id)
+            index = start(vehicle_id)
             route = []
             
-            while not self.routing.IsEnd(index):
-                node_index = self.manager.IndexToNode(index)
-                route.append(node_index)
-                index = self.solution.Value(self.routing.NextVar(index))
+            while not is_end(index):
+                route.append(index_to_node(index))
+                index = value(next_var(index))
             
             # Adicionar o depósito final
-            route.append(self.manager.IndexToNode(index))
+            route.append(index_to_node(index))
             
             # Só adicionar rotas que visitam pelo menos um cliente
             if len(route) > 2:  # Mais que depósito inicial e final
@@ -265,10 +574,28 @@ class VRPOptimizer:
         Returns:
             Distância total em metros
         """
-        distance = 0
-        for i in range(len(route) - 1):
-            distance += self.distance_matrix[route[i]][route[i + 1]]
-        return distance
+        stops = np.asarray(route, dtype=np.intp)
+        distance_matrix = np.asarray(self.distance_matrix)
+        return float(distance_matrix[stops[:-1], stops[1:]].sum())
+    
+    def _get_dimension_route_distances(self) -> List[int]:
+        """
+        Lê a distância de cada rota do acumulado final da dimensão 'Distance'.
+        
+        Returns:
+            Lista com a distância de cada rota (veículos usados) em metros
+        """
+        distance_dimension = self.routing.GetDimensionOrDie('Distance')
+        cumul_var = distance_dimension.CumulVar
+        end = self.routing.End
+        is_vehicle_used = self.routing.IsVehicleUsed
+        value = self.solution.Value
+        
+        return [
+            value(cumul_var(end(vehicle_id)))
+            for vehicle_id in range(self.num_vehicles)
+            if is_vehicle_used(self.solution, vehicle_id)
+        ]
     
     def get_metrics(self) -> Dict:
         """
@@ -281,15 +608,32 @@ class VRPOptimizer:
             return {}
         
         routes = self.get_routes()
-        total_distance = 0
-        max_route_distance = 0
         route_distances = []
+        route_loads = []
+        
+        if routes:
+            # Todos os trechos de todas as rotas em uma única indexação
+            route_lengths = np.array([len(route) for route in routes])
+            route_starts = np.cumsum(route_lengths) - route_lengths
+            stops = np.concatenate(routes).astype(np.intp)
+            
+            if self._integer_distances:
+                # O OR-Tools já somou as distâncias durante a busca
+                route_distances = [float(d) for d in self._get_dimension_route_distances()]
+            else:
+                distance_matrix = np.asarray(self.distance_matrix)
+                legs = distance_matrix[stops[:-1], stops[1:]].astype(np.float64)
+                # Descartar as ligações entre o fim de uma rota e o início da próxima
+                legs[route_starts[1:] - 1] = 0
+                route_distances = np.add.reduceat(legs, route_starts).tolist()
+            
+            if self.vehicle_capacities and self.demands:
+                stop_demands = np.asarray(self.demands)[stops]
+                stop_demands[stops == self.depot_index] = 0
+                route_loads = np.add.reduceat(stop_demands, route_starts).tolist()
         
-        for route in routes:
-            distance = self.get_route_distance(route)
-            route_distances.append(distance)
-            total_distance += distance
-            max_route_distance = max(max_route_distance, distance)
+        total_distance = sum(route_distances)
+        max_route_distance = max(route_distances, default=0)
         
         metrics = {
             'objective_value': self.solution.ObjectiveValue(),
@@ -300,15 +644,11 @@ class VRPOptimizer:
             'route_distances': route_distances,
             'routes': routes,
             'execution_time': getattr(self, 'execution_time', 0),
-            'algorithm': 'OR-Tools'
+            'algorithm': self.algorithm
         }
         
         # Adicionar métricas de capacidade se disponíveis
         if self.vehicle_capacities and self.demands:
-            route_loads = []
-            for route in routes:
-                load = sum(self.demands[node] for node in route if node != self.depot_index)
-                route_loads.append(load)
             metrics['route_loads'] = route_loads
         
         return metrics
@@ -344,3 +684,26 @@ class VRPOptimizer:
             
             print()
 
+
+def _solve_multistart_worker(problem, time_limit_seconds, strategy, local_search):
+    """
+    Executa uma busca do solve_parallel (em um processo separado).
+    
+    Returns:
+        Tupla (valor objetivo, sequência de clientes de cada veículo) ou
+        None se não encontrou solução
+    """
+    (distance_matrix, num_vehicles, depot_index, vehicle_capacities,
+     demands, time_windows, max_distance_per_vehicle) = problem
+    optimizer = VRPOptimizer(
+        distance_matrix=distance_matrix,
+        num_vehicles=num_vehicles,
+        depot_index=depot_index,
+        vehicle_capacities=vehicle_capacities,
+        demands=demands,
+        time_windows=time_windows,
+        max_distance_per_vehicle=max_distance_per_vehicle
+    )
+    if not optimizer.solve(time_limit_seconds, strategy, local_search):
+        return None
+    return optimizer.solution.ObjectiveValue(), optimizer._get_vehicle_sequences()
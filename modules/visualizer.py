@@ -3,14 +3,16 @@ Módulo de Visualização
 Criação de mapas e gráficos para análise de rotas
 """
 
-import folium
-from folium import plugins
-import plotly.graph_objects as go
-import plotly.express as px
-from typing import List, Tuple, Dict, Optional
-import pandas as pd
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional
 import numpy as np
 
+# folium, plotly e pandas são importados dentro dos métodos que os usam,
+# para que importar este módulo (app, testes, otimização) continue leve
+if TYPE_CHECKING:
+    import folium
+    import plotly.graph_objects as go
+    import pandas as pd
+
 
 class RouteVisualizer:
     """
@@ -18,11 +20,15 @@ class RouteVisualizer:
     """
     
     # Cores para diferentes veículos
-    VEHICLE_COLORS = [
+    VEHICLE_COLORS = (
         '#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A', 
         '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E2',
         '#F8B739', '#52B788', '#E76F51', '#2A9D8F'
-    ]
+    )
+    
+    # A partir deste número de localizações os clientes são agrupados em
+    # clusters (MarkerCluster) para aliviar a renderização do mapa
+    CLUSTER_MIN_LOCATIONS = 200
     
     @staticmethod
     def create_route_map(
@@ -31,8 +37,9 @@ class RouteVisualizer:
         names: List[str],
         depot_index: int = 0,
         route_distances: Optional[List[float]] = None,
-        zoom_start: int = 11
-    ) -> folium.Map:
+        zoom_start: int = 11,
+        interactive_controls: bool = True
+    ) -> 'folium.Map':
         """
         Cria um mapa interativo com as rotas otimizadas.
         
@@ -43,15 +50,20 @@ class RouteVisualizer:
             depot_index: Índice do depósito
             route_distances: Distâncias das rotas em metros (opcional)
             zoom_start: Nível de zoom inicial
+            interactive_controls: Adiciona controle de camadas, tela cheia e
+                medidor de distância (dispensáveis em relatórios HTML)
             
         Returns:
             Objeto folium.Map
         """
+        import folium
+        from folium import plugins
+        
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        lats, lons = points[:, 0].tolist(), points[:, 1].tolist()
+        
         # Calcular centro do mapa
-        lats = [loc[0] for loc in locations]
-        lons = [loc[1] for loc in locations]
-        center_lat = sum(lats) / len(lats)
-        center_lon = sum(lons) / len(lons)
+        center_lat, center_lon = points.mean(axis=0).tolist()
         
         # Criar mapa
         m = folium.Map(
@@ -61,7 +73,7 @@ class RouteVisualizer:
         )
         
         # Adicionar depósito
-        depot_lat, depot_lon = locations[depot_index]
+        depot_lat, depot_lon = lats[depot_index], lons[depot_index]
         folium.Marker(
             location=[depot_lat, depot_lon],
             popup=f"<b>{names[depot_index]}</b><br>Depósito",
@@ -69,12 +81,19 @@ class RouteVisualizer:
             icon=folium.Icon(color='red', icon='home', prefix='fa')
         ).add_to(m)
         
-        # Adicionar rotas
+        # Agrupar os clientes em clusters apenas em mapas grandes
+        use_clusters = len(points) > RouteVisualizer.CLUSTER_MIN_LOCATIONS
+        
+        colors = RouteVisualizer.VEHICLE_COLORS
+        num_colors = len(colors)
+        
+        # Adicionar rotas (uma camada por veículo)
         for vehicle_id, route in enumerate(routes):
-            color = RouteVisualizer.VEHICLE_COLORS[vehicle_id % len(RouteVisualizer.VEHICLE_COLORS)]
+            color = colors[vehicle_id % num_colors]
+            layer = folium.FeatureGroup(name=f"Veículo {vehicle_id + 1}")
             
             # Criar linha da rota
-            route_coords = [locations[idx] for idx in route]
+            route_coords = points[np.asarray(route, dtype=np.intp)].tolist()
             
             # Informações da rota
             distance_info = ""
@@ -89,56 +108,45 @@ class RouteVisualizer:
                 opacity=0.7,
                 popup=f"<b>Veículo {vehicle_id + 1}</b>{distance_info}",
                 tooltip=f"Veículo {vehicle_id + 1}"
-            ).add_to(m)
+            ).add_to(layer)
             
-            # Adicionar marcadores dos clientes
-            for seq, idx in enumerate(route):
-                if idx == depot_index:
-                    continue  # Pular depósito
-                
-                lat, lon = locations[idx]
-                
-                # Criar popup com informações
-                popup_html = f"""
-                <div style="font-family: Arial; font-size: 12px;">
-                    <b>{names[idx]}</b><br>
-                    Veículo: {vehicle_id + 1}<br>
-                    Sequência: {seq}<br>
-                    Coordenadas: {lat:.4f}, {lon:.4f}
-                </div>
-                """
-                
-                folium.Marker(
-                    location=[lat, lon],
-                    popup=folium.Popup(popup_html, max_width=250),
-                    tooltip=f"{names[idx]} (V{vehicle_id + 1})",
-                    icon=folium.Icon(
-                        color='blue',
-                        icon='info-sign',
-                        prefix='glyphicon'
-                    )
-                ).add_to(m)
-                
-                # Adicionar número de sequência
+            marker_parent = plugins.MarkerCluster().add_to(layer) if use_clusters else layer
+            
+            # Popups e tooltips dos clientes montados de uma vez
+            stops = [(seq, idx) for seq, idx in enumerate(route) if idx != depot_index]
+            popups = [
+                f'<div style="font-family: Arial; font-size: 12px;"><b>{names[idx]}</b><br>'
+                f'Veículo: {vehicle_id + 1}<br>Sequência: {seq}<br>'
+                f'Coordenadas: {lats[idx]:.4f}, {lons[idx]:.4f}</div>'
+                for seq, idx in stops
+            ]
+            tooltips = [f"{names[idx]} (V{vehicle_id + 1})" for _, idx in stops]
+            
+            # Adicionar um marcador por cliente (com sequência no popup)
+            for (seq, idx), popup, tooltip in zip(stops, popups, tooltips):
                 folium.CircleMarker(
-                    location=[lat, lon],
+                    location=route_coords[seq],
                     radius=8,
-                    popup=f"Sequência: {seq}",
+                    popup=popup,
+                    tooltip=tooltip,
                     color=color,
                     fill=True,
                     fillColor=color,
                     fillOpacity=0.6,
                     weight=2
-                ).add_to(m)
-        
-        # Adicionar controle de camadas
-        folium.LayerControl().add_to(m)
-        
-        # Adicionar plugin de fullscreen
-        plugins.Fullscreen().add_to(m)
+                ).add_to(marker_parent)
+            
+            layer.add_to(m)
         
-        # Adicionar medidor de distância
-        plugins.MeasureControl(position='topleft').add_to(m)
+        if interactive_controls:
+            # Adicionar controle de camadas
+            folium.LayerControl().add_to(m)
+            
+            # Adicionar plugin de fullscreen
+            plugins.Fullscreen().add_to(m)
+            
+            # Adicionar medidor de distância
+            plugins.MeasureControl(position='topleft').add_to(m)
         
         return m
     
@@ -146,7 +154,7 @@ class RouteVisualizer:
     def create_distance_chart(
         route_distances: List[float],
         route_labels: Optional[List[str]] = None
-    ) -> go.Figure:
+    ) -> 'go.Figure':
         """
         Cria gráfico de barras com distâncias das rotas.
         
@@ -157,10 +165,17 @@ class RouteVisualizer:
         Returns:
             Figura plotly
         """
+        import plotly.graph_objects as go
+        
         if not route_labels:
             route_labels = [f"Veículo {i+1}" for i in range(len(route_distances))]
         
-        distances_km = [d / 1000 for d in route_distances]
+        distances_km = (np.asarray(route_distances, dtype=np.float64) / 1000).tolist()
+        
+        # Repetir a paleta quando houver mais rotas do que cores
+        colors = RouteVisualizer.VEHICLE_COLORS
+        num_colors = len(colors)
+        bar_colors = [colors[i % num_colors] for i in range(len(route_distances))]
         
         fig = go.Figure(data=[
             go.Bar(
@@ -168,7 +183,7 @@ class RouteVisualizer:
                 y=distances_km,
                 text=[f"{d:.2f} km" for d in distances_km],
                 textposition='auto',
-                marker_color=RouteVisualizer.VEHICLE_COLORS[:len(route_distances)]
+                marker_color=bar_colors
             )
         ])
         
@@ -183,7 +198,7 @@ class RouteVisualizer:
         return fig
     
     @staticmethod
-    def create_cost_breakdown_chart(costs: Dict) -> go.Figure:
+    def create_cost_breakdown_chart(costs: Dict) -> 'go.Figure':
         """
         Cria gráfico de pizza com breakdown de custos.
         
@@ -193,6 +208,8 @@ class RouteVisualizer:
         Returns:
             Figura plotly
         """
+        import plotly.graph_objects as go
+        
         labels = ['Combustível', 'Motorista', 'Depreciação', 'Pedágios', 'Operacional']
         values = [
             costs['total_fuel_cost'],
@@ -225,7 +242,7 @@ class RouteVisualizer:
         scenario2_distances: List[float],
         scenario1_name: str = "Sem Otimização",
         scenario2_name: str = "Com Otimização"
-    ) -> go.Figure:
+    ) -> 'go.Figure':
         """
         Cria gráfico comparando dois cenários.
         
@@ -238,6 +255,8 @@ class RouteVisualizer:
         Returns:
             Figura plotly
         """
+        import plotly.graph_objects as go
+        
         total1 = sum(scenario1_distances) / 1000
         total2 = sum(scenario2_distances) / 1000
         
@@ -271,7 +290,7 @@ class RouteVisualizer:
         return fig
     
     @staticmethod
-    def create_metrics_table(metrics: Dict) -> pd.DataFrame:
+    def create_metrics_table(metrics: Dict) -> 'pd.DataFrame':
         """
         Cria tabela com métricas da solução.
         
@@ -281,6 +300,8 @@ class RouteVisualizer:
         Returns:
             DataFrame pandas
         """
+        import pandas as pd
+        
         data = {
             'Métrica': [
                 'Distância Total',
@@ -302,7 +323,7 @@ class RouteVisualizer:
     def create_load_chart(
         route_loads: List[int],
         vehicle_capacities: List[int]
-    ) -> go.Figure:
+    ) -> 'go.Figure':
         """
         Cria gráfico de carga por veículo.
         
@@ -313,6 +334,8 @@ class RouteVisualizer:
         Returns:
             Figura plotly
         """
+        import plotly.graph_objects as go
+        
         vehicle_labels = [f"Veículo {i+1}" for i in range(len(route_loads))]
         
         fig = go.Figure()
@@ -349,7 +372,7 @@ class RouteVisualizer:
         return fig
     
     @staticmethod
-    def create_co2_chart(co2_kg: float) -> go.Figure:
+    def create_co2_chart(co2_kg: float) -> 'go.Figure':
         """
         Cria gráfico de emissões de CO2.
         
@@ -359,6 +382,8 @@ class RouteVisualizer:
         Returns:
             Figura plotly
         """
+        import plotly.graph_objects as go
+        
         # Converter para toneladas se necessário
         if co2_kg > 1000:
             value = co2_kg / 1000
@@ -395,12 +420,16 @@ class RouteVisualizer:
     
     @staticmethod
     def save_map_html(
-        map_obj: folium.Map,
+        map_obj: 'folium.Map',
         filepath: str
     ):
         """
         Salva mapa em arquivo HTML.
         
+        Para relatórios sem os controles interativos (e sem os plugins JS
+        que eles carregam), crie o mapa com
+        create_route_map(..., interactive_controls=False) antes de salvar.
+        
         Args:
             map_obj: Objeto folium.Map
             filepath: Caminho do arquivo de saída
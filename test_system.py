@@ -3,12 +3,22 @@ Script de Teste do Sistema de Otimização Logística
 Testa todas as funcionalidades principais
 """
 
+import argparse
+import io
+import json
+import multiprocessing
 import sys
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import numpy as np
 from modules.optimizer import VRPOptimizer
 from modules.cost_calculator import CostCalculator
 from modules.data_handler import DataHandler
 from modules.visualizer import RouteVisualizer
+from modules.nearest_neighbor import NearestNeighborOptimizer
+from modules import _numba_kernels
 
 def test_basic_vrp():
     """Testa otimização VRP básica."""
@@ -62,11 +72,11 @@ def test_basic_vrp():
         # Imprimir rotas
         print(f"\nROTAS:")
         routes = metrics['routes']
-        for i, route in enumerate(routes):
-            distance = metrics['route_distances'][i]
-            route_names = " → ".join([names[idx] for idx in route])
+        route_distances_km = (np.asarray(metrics['route_distances'], dtype=np.float64) / 1000).tolist()
+        for i, (route, distance_km) in enumerate(zip(routes, route_distances_km)):
+            route_names = " → ".join(map(names.__getitem__, route))
             print(f"  Veículo {i+1}: {route_names}")
-            print(f"    Distância: {distance/1000:.2f} km")
+            print(f"    Distância: {distance_km:.2f} km")
         
         return True
     else:
@@ -130,17 +140,18 @@ def test_cvrp():
         print(f"\nROTAS E CARGAS:")
         routes = metrics['routes']
         route_loads = metrics['route_loads']
+        route_distances_km = (np.asarray(metrics['route_distances'], dtype=np.float64) / 1000).tolist()
         
         for i, route in enumerate(routes):
-            distance = metrics['route_distances'][i]
+            distance_km = route_distances_km[i]
             load = route_loads[i]
             capacity = vehicle_capacities[i]
             utilization = (load / capacity) * 100
             
-            route_names = " → ".join([names[idx] for idx in route])
+            route_names = " → ".join(map(names.__getitem__, route))
             print(f"  Veículo {i+1}:")
             print(f"    Rota: {route_names}")
-            print(f"    Distância: {distance/1000:.2f} km")
+            print(f"    Distância: {distance_km:.2f} km")
             print(f"    Carga: {load}/{capacity} ({utilization:.1f}% utilização)")
         
         return True
@@ -148,6 +159,74 @@ def test_cvrp():
         print("❌ Não foi possível encontrar solução")
         return False
 
+def test_exact_small_instance():
+    """Testa o solver exato (CP-SAT) contra a metaheurística."""
+    print("\n" + "="*60)
+    print("TESTE: Solver Exato (CP-SAT)")
+    print("="*60)
+    
+    # Sem e com capacidade (padrões do app: 4 veículos de capacidade 100)
+    for num_locations, num_vehicles, include_demands in ((8, 3, False), (VRPOptimizer.exact_max_locations(4), 4, True)):
+        data = DataHandler.create_sample_data(num_locations=num_locations, radius_km=30, include_demands=include_demands)
+        distance_matrix = DataHandler.create_distance_matrix(data['locations'])
+        kwargs = dict(num_vehicles=num_vehicles, max_distance_per_vehicle=200000)
+        if include_demands:
+            kwargs.update(vehicle_capacities=[100] * num_vehicles, demands=data['demands'])
+        
+        exact = VRPOptimizer(distance_matrix, **kwargs)
+        heuristic = VRPOptimizer(distance_matrix, **kwargs)
+        
+        print(f"⏳ {num_locations} localizações, {num_vehicles} veículos")
+        print("⏳ Resolvendo com CP-SAT (exigindo prova de otimalidade)...")
+        assert exact.solve_exact(time_limit_seconds=10, require_optimal=True), "CP-SAT não provou a otimalidade"
+        print("⏳ Resolvendo com OR-Tools + GLS...")
+        assert heuristic.solve(time_limit_seconds=1), "Metaheurística não encontrou solução"
+        
+        exact_objective = exact.get_metrics()['objective_value']
+        heuristic_objective = heuristic.get_metrics()['objective_value']
+        print(f"  Objetivo exato: {exact_objective}")
+        print(f"  Objetivo GLS:   {heuristic_objective}")
+        assert exact_objective <= heuristic_objective, "Solução exata pior que a heurística"
+    
+    # Sem prova de otimalidade dentro do tempo, a solução deve ser descartada
+    data = DataHandler.create_sample_data(num_locations=14, radius_km=30)
+    distance_matrix = DataHandler.create_distance_matrix(data['locations'])
+    unproven = VRPOptimizer(distance_matrix, num_vehicles=5, max_distance_per_vehicle=200000)
+    assert not unproven.solve_exact(time_limit_seconds=0.3, require_optimal=True), \
+        "Solução sem prova de otimalidade foi aceita"
+    assert unproven.solution is None
+    
+    print("✅ Solver exato consistente!")
+    return True
+
+def test_parallel_solve():
+    """Testa a busca multi-start em processos paralelos."""
+    print("\n" + "="*60)
+    print("TESTE: Multi-start Paralelo")
+    print("="*60)
+    
+    data = DataHandler.create_sample_data(num_locations=10, radius_km=30, include_demands=False)
+    distance_matrix = DataHandler.create_distance_matrix(data['locations'])
+    optimizer = VRPOptimizer(distance_matrix, num_vehicles=3, max_distance_per_vehicle=200000)
+    
+    print("⏳ Resolvendo com 2 buscas independentes...")
+    assert optimizer.solve_parallel(n_workers=2, time_limit_seconds=1), "Nenhuma busca encontrou solução"
+    assert optimizer.best_config in VRPOptimizer.MULTISTART_CONFIGS[:2]
+    print(f"  Melhor configuração: {optimizer.best_config}")
+    
+    # A solução escolhida é recarregada no modelo local (_load_routes):
+    # as métricas devem bater com a soma das rotas na matriz
+    metrics = optimizer.get_metrics()
+    routes = metrics['routes']
+    assert metrics['route_distances'] == [optimizer.get_route_distance(route) for route in routes]
+    assert metrics['total_distance'] == sum(metrics['route_distances'])
+    customers = sorted(node for route in routes for node in route[1:-1])
+    assert customers == list(range(1, len(data['locations']))), "Clientes faltando ou repetidos"
+    print(f"  Distância Total: {metrics['total_distance']/1000:.2f} km")
+    
+    print("✅ Multi-start consistente!")
+    return True
+
 def test_cost_calculator():
     """Testa calculadora de custos."""
     print("\n" + "="*60)
@@ -189,6 +268,18 @@ def test_cost_calculator():
     print(f"\nIMPACTO AMBIENTAL:")
     print(f"  Emissões CO2: {costs['total_co2_kg']:.2f} kg")
     
+    # Detalhamento por rota: lista de dicionários (padrão) ou colunas
+    for route_cost, distance_km in zip(costs['route_costs'], route_distances_km):
+        expected = calculator.calculate_total_cost(distance_km)
+        assert route_cost.keys() == expected.keys(), "Chaves do detalhamento por rota mudaram"
+        assert all(abs(route_cost[key] - expected[key]) < 1e-9 for key in expected)
+    columns = calculator.calculate_route_costs(route_distances_km, columnar=True)['route_costs']
+    assert np.allclose(columns['total_cost'], [rc['total_cost'] for rc in costs['route_costs']])
+    
+    # Parâmetros alterados depois da construção devem valer nos cálculos
+    calculator.fuel_price_per_liter = 7.00
+    assert calculator.calculate_fuel_cost(80) == 70.0, "Custo não reflete o novo preço do combustível"
+    
     return True
 
 def test_data_handler():
@@ -225,6 +316,34 @@ def test_data_handler():
     print(f"  Tempo: {DataHandler.format_time(3.75)}")
     print(f"  Moeda: {DataHandler.format_currency(1234.56)}")
     
+    # Os kernels Numba só entram acima de NUMBA_MIN_LOCATIONS: comparar com
+    # a versão NumPy (incluindo o arredondamento para int32)
+    if _numba_kernels.NUMBA_AVAILABLE:
+        print("✓ Testando kernel Numba de distâncias...")
+        for num_locations in (201, 401):
+            locations = DataHandler.create_sample_data(num_locations=num_locations)['locations']
+            lats, lons = locations[:, 0], locations[:, 1]
+            reference = DataHandler._haversine_matrix(lats, lons)
+            
+            distance_matrix = DataHandler.create_distance_matrix(locations)
+            assert distance_matrix.dtype == np.int32
+            assert np.array_equal(distance_matrix, np.rint(reference).astype(np.int32)), \
+                "Kernel Numba diverge da versão NumPy"
+            float_matrix = DataHandler.create_distance_matrix(locations, dtype=np.float64)
+            assert np.allclose(float_matrix, reference, rtol=0, atol=1e-6)
+            assert abs(float_matrix[3, 7] - DataHandler.haversine_distance(*locations[3], *locations[7])) < 1e-6
+        print("  Matrizes de 201 e 401 localizações iguais à versão NumPy")
+        
+        print("✓ Testando kernel Numba do Nearest Neighbor...")
+        for depot_index in (0, 5):
+            fast = NearestNeighborOptimizer(distance_matrix, num_vehicles=4, depot_index=depot_index)
+            masked = NearestNeighborOptimizer(distance_matrix, num_vehicles=4, depot_index=depot_index)
+            # Forçar a versão com máscara e argmin na mesma instância
+            masked.NUMBA_MIN_LOCATIONS = len(distance_matrix)
+            assert fast.solve() and masked.solve()
+            assert fast.solution == masked.solution, "Kernel Numba diverge da versão NumPy"
+        print(f"  Rotas de {len(distance_matrix)} localizações iguais (depósito 0 e 5)")
+    
     return True
 
 def test_csv_loading():
@@ -233,7 +352,7 @@ def test_csv_loading():
     print("TESTE 5: Carregamento de CSV")
     print("="*60)
     
-    csv_path = "/home/ubuntu/sistema_otimizacao_logistica/data/exemplo_clientes.csv"
+    csv_path = Path(__file__).resolve().parent / "data" / "exemplo_clientes.csv"
     
     try:
         print(f"⏳ Carregando {csv_path}...")
@@ -262,26 +381,110 @@ def test_csv_loading():
         
         print(f"  Matriz de distâncias: {distance_matrix.shape}")
         
+        # Objetos de arquivo (como uploads) também devem ser aceitos
+        with open(csv_path, 'rb') as f:
+            data_from_file = DataHandler.load_locations_from_csv(f, demand_column='demanda')
+        assert data_from_file['names'] == names, "Leitura de objeto de arquivo diverge do caminho"
+        assert np.array_equal(data_from_file['locations'], locations)
+        print("✓ Leitura a partir de objeto de arquivo")
+        
         return True
     
     except Exception as e:
         print(f"❌ Erro ao carregar CSV: {str(e)}")
         return False
 
-def run_all_tests():
-    """Executa todos os testes."""
+def test_map_export():
+    """Testa a exportação do mapa em HTML."""
+    print("\n" + "="*60)
+    print("TESTE: Exportação do Mapa")
+    print("="*60)
+    
+    data = DataHandler.create_sample_data(num_locations=6, radius_km=20)
+    routes = [[0, 1, 2, 0], [0, 3, 4, 5, 0]]
+    full_map = RouteVisualizer.create_route_map(data['locations'], routes, data['names'])
+    report_map = RouteVisualizer.create_route_map(
+        data['locations'], routes, data['names'], interactive_controls=False
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        full_path = Path(tmp_dir) / "mapa.html"
+        report_path = Path(tmp_dir) / "mapa_relatorio.html"
+        RouteVisualizer.save_map_html(full_map, full_path)
+        RouteVisualizer.save_map_html(report_map, report_path)
+        full_html = full_path.read_text(encoding='utf-8')
+        report_html = report_path.read_text(encoding='utf-8')
+    
+    print(f"  Completo:  {len(full_html)} bytes")
+    print(f"  Relatório: {len(report_html)} bytes")
+    assert 'fullscreen' in full_html.lower()
+    assert 'fullscreen' not in report_html.lower(), "Plugins JS mantidos no HTML do relatório"
+    assert 'measure' not in report_html.lower()
+    assert 'L.control.layers' not in report_html
+    assert len(report_html) < len(full_html)
+    
+    print("✅ Mapa exportado!")
+    return True
+
+TESTS = [
+    ("VRP Básico", test_basic_vrp),
+    ("CVRP", test_cvrp),
+    ("Solver Exato", test_exact_small_instance),
+    ("Multi-start Paralelo", test_parallel_solve),
+    ("Calculadora de Custos", test_cost_calculator),
+    ("Manipulação de Dados", test_data_handler),
+    ("Carregamento CSV", test_csv_loading),
+    ("Exportação do Mapa", test_map_export),
+]
+
+def _run_captured(test_function):
+    """Executa um teste guardando a saída, para não misturar a dos processos."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            result = test_function()
+        except AssertionError as e:
+            print(f"❌ Falha: {e}")
+            result = False
+    return result, output.getvalue()
+
+def run_all_tests(max_workers=None, fail_fast=False, json_path=None):
+    """
+    Executa todos os testes.
+    
+    Os testes são independentes e rodam em processos separados; a saída
+    de cada um é impressa na ordem original à medida que ficam prontos.
+    Com fail_fast, rodam um por vez no próprio processo, e nenhum teste
+    inicia depois da primeira falha.
+    
+    Args:
+        max_workers: Número de processos (padrão: um por teste)
+        fail_fast: Interrompe na primeira falha
+        json_path: Arquivo onde gravar o resumo em JSON (opcional)
+    """
     print("\n" + "="*60)
     print("SISTEMA DE OTIMIZAÇÃO LOGÍSTICA - SUITE DE TESTES")
     print("="*60)
     
     results = []
     
-    # Executar testes
-    results.append(("VRP Básico", test_basic_vrp()))
-    results.append(("CVRP", test_cvrp()))
-    results.append(("Calculadora de Custos", test_cost_calculator()))
-    results.append(("Manipulação de Dados", test_data_handler()))
-    results.append(("Carregamento CSV", test_csv_loading()))
+    if fail_fast:
+        for test_name, test_function in TESTS:
+            result, output = _run_captured(test_function)
+            sys.stdout.write(output)
+            results.append((test_name, result))
+            if not result:
+                break
+    else:
+        # 'spawn' evita herdar estado do OR-Tools/NumPy via fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers or len(TESTS), mp_context=context) as executor:
+            futures = [executor.submit(_run_captured, test_function) for _, test_function in TESTS]
+            
+            for (test_name, _), future in zip(TESTS, futures):
+                result, output = future.result()
+                sys.stdout.write(output)
+                results.append((test_name, result))
     
     # Resumo
     print("\n" + "="*60)
@@ -295,8 +498,20 @@ def run_all_tests():
         status = "✅ PASSOU" if result else "❌ FALHOU"
         print(f"  {test_name}: {status}")
     
+    if total < len(TESTS):
+        print(f"\n⏹️ Interrompido na primeira falha ({len(TESTS) - total} teste(s) não contabilizado(s))")
+    
     print(f"\n{passed}/{total} testes passaram ({(passed/total)*100:.1f}%)")
     
+    if json_path:
+        summary = {
+            'results': [{'name': test_name, 'passed': bool(result)} for test_name, result in results],
+            'passed': passed,
+            'total': total
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    
     if passed == total:
         print("\n🎉 Todos os testes passaram! Sistema funcionando corretamente.")
         return True
@@ -305,6 +520,10 @@ def run_all_tests():
         return False
 
 if __name__ == "__main__":
-    success = run_all_tests()
+    parser = argparse.ArgumentParser(description="Suite de testes do sistema de otimização logística")
+    parser.add_argument('--fail-fast', action='store_true', help="Parar na primeira falha")
+    parser.add_argument('--json', type=Path, help="Gravar o resumo dos testes em JSON")
+    args = parser.parse_args()
+    
+    success = run_all_tests(fail_fast=args.fail_fast, json_path=args.json)
     sys.exit(0 if success else 1)
-